@@ -0,0 +1,95 @@
+"""
+Time of the message_* builders of WhatsAppResponse, which run
+replace_text, the *_to_data conversion and the _standard_message dump.
+
+    python -m benchmarks.bench_response_models --messages 10000
+"""
+import argparse
+import time
+
+from yeeko_abc_message_models.response.models import (
+    Button, Header, ReplyMessage, Section, SectionHeader, SectionsMessage)
+from yeeko_abc_message_models.whatsapp_message.response import WhatsAppResponse
+
+PARAMETERS = {"name": "Ana", "user": {"city": "Puebla"}}
+
+
+class BenchResponse(WhatsAppResponse):
+
+    def _get_parameters(self) -> dict:
+        return PARAMETERS
+
+    def _send_message(self, message: dict):
+        pass
+
+
+def few_buttons(response: WhatsAppResponse):
+    response.message_few_buttons(ReplyMessage(
+        body="¿Sigues en {{user.city}}?",
+        header=Header(type="image", value="https://example.com/a.png"),
+        footer="Responde con un botón",
+        buttons=[
+            Button(title="Sí {{name}}", payload="yes"),
+            Button(title="No", payload="no"),
+        ]))
+
+
+def many_buttons(response: WhatsAppResponse):
+    response.message_many_buttons(ReplyMessage(
+        body="Elige una opción",
+        buttons=[SectionHeader(title="Temas")] + [
+            Button(title=f"Opción {i}", payload=f"p{i}",
+                   description=f"Detalle {i}")
+            for i in range(8)
+        ]))
+
+
+def sections(response: WhatsAppResponse):
+    response.message_sections(SectionsMessage(
+        body="Hola {{name}}", button_text="Ver opciones",
+        sections=[Section(title="Menú", buttons=[
+            Button(title=f"Plato {i}", payload=f"s{i}") for i in range(5)
+        ])]))
+
+
+def text(response: WhatsAppResponse):
+    response.message_text("Hola {{name}}, bienvenida a {{user.city}}")
+
+
+def media(response: WhatsAppResponse):
+    response.message_multimedia(
+        "image", url_media="https://example.com/a.png", caption="Foto")
+
+
+BUILDERS = {
+    "message_text": text,
+    "message_multimedia": media,
+    "message_few_buttons": few_buttons,
+    "message_many_buttons": many_buttons,
+    "message_sections": sections,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=10_000)
+    args = parser.parse_args()
+
+    total = 0.0
+    for name, builder in BUILDERS.items():
+        response = BenchResponse(
+            sender_uid="5215512345678", account_pid="PID",
+            account_token="token")
+        started = time.perf_counter()
+        for _ in range(args.messages):
+            builder(response)
+        elapsed = time.perf_counter() - started
+        total += elapsed
+        print(
+            f"{name:<22} {elapsed:6.2f}s "
+            f"{elapsed / args.messages * 1e6:7.1f}us/message")
+    print(f"{'total':<22} {total:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+p99 latency of live replies while a broadcast is being sent.
+
+Compares a FIFO thread pool calling send_messages (what the blocking path
+amounts to under load) with OutboundScheduler and PRIORITY_LIVE replies.
+
+    python -m benchmarks.bench_scheduler
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from yeeko_abc_message_models.response.scheduler import (
+    PRIORITY_BULK, PRIORITY_LIVE, OutboundScheduler)
+from yeeko_abc_message_models.utils.stats import summarize
+from yeeko_abc_message_models.whatsapp_message.response import WhatsAppResponse
+
+SEND_SECONDS = 0.002
+
+
+class SleepResponse(WhatsAppResponse):
+    # stands in for the Graph API round trip
+
+    def _get_parameters(self) -> dict:
+        return {}
+
+    def _send_message(self, message: dict):
+        time.sleep(SEND_SECONDS)
+        if message is self.message_list[-1]:
+            LiveReplies.done(self)
+
+
+class LiveReplies:
+    lock = threading.Lock()
+    submitted: dict = {}
+    finished: dict = {}
+
+    @classmethod
+    def reset(cls):
+        cls.submitted, cls.finished = {}, {}
+
+    @classmethod
+    def done(cls, response: WhatsAppResponse):
+        if response.priority == PRIORITY_LIVE:
+            with cls.lock:
+                cls.finished[response.sender_uid] = time.perf_counter()
+
+    @classmethod
+    def latencies(cls):
+        return [
+            cls.finished[uid] - started
+            for uid, started in cls.submitted.items()
+        ]
+
+
+def build(uid: str, pid: str, priority: int, messages: int, scheduler=None):
+    response = SleepResponse(
+        sender_uid=uid, account_pid=pid, account_token="token",
+        priority=priority, scheduler=scheduler)
+    for number in range(messages):
+        response.message_text(f"message {number}")
+    return response
+
+
+def run(args, use_scheduler: bool) -> dict:
+    LiveReplies.reset()
+    scheduler = OutboundScheduler(workers=args.workers).start() \
+        if use_scheduler else None
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+
+    def send(response):
+        if scheduler:
+            response.send_messages()
+        else:
+            pool.submit(response.send_messages)
+
+    for number in range(args.broadcast):
+        send(build(f"bulk{number}", "campaign", PRIORITY_BULK, 3, scheduler))
+
+    for number in range(args.live):
+        response = build(f"live{number}", "chat", PRIORITY_LIVE, 2, scheduler)
+        LiveReplies.submitted[response.sender_uid] = time.perf_counter()
+        send(response)
+        time.sleep(args.live_interval)
+
+    if scheduler:
+        scheduler.stop()
+    pool.shutdown(wait=True)
+    return summarize(LiveReplies.latencies())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--broadcast", type=int, default=300)
+    parser.add_argument("--live", type=int, default=30)
+    parser.add_argument("--live-interval", type=float, default=0.01)
+    args = parser.parse_args()
+
+    for name, use_scheduler in (("fifo pool", False), ("scheduler", True)):
+        summary = run(args, use_scheduler)
+        print(
+            f"{name:<10} live reply p50={summary['p50'] * 1000:.1f}ms "
+            f"p99={summary['p99'] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,5 +14,8 @@ setup(
         "pydantic==2.10.5",
         "requests==2.32.3"
     ],
+    extras_require={
+        "analytics": ["numpy"],
+    },
     python_requires='>=3.6',
 )
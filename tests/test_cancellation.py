@@ -0,0 +1,144 @@
+import pytest
+import requests
+
+from yeeko_abc_message_models.response.cancellation import ReplyRegistry
+from yeeko_abc_message_models.response.scheduler import OutboundScheduler
+from yeeko_abc_message_models.testing.fake_graph_api import (
+    FakeGraphApi, FakeGraphApiConfig)
+from yeeko_abc_message_models.utils.circuit_breaker import (
+    CLOSED, OPEN, CircuitBreakerRegistry, CircuitOpenError)
+from yeeko_abc_message_models.whatsapp_message import response as wa_response
+from yeeko_abc_message_models.whatsapp_message.response import WhatsAppResponse
+
+
+class FailingResponse(WhatsAppResponse):
+    error: type = Exception
+
+    def _get_parameters(self) -> dict:
+        return {}
+
+    def _send_message(self, message: dict):
+        self.cancel()
+        raise self.error("boom")
+
+
+def build(error: type) -> FailingResponse:
+    response = FailingResponse(
+        sender_uid="1", account_pid="PID", account_token="token", error=error)
+    response.message_text("hola")
+    return response
+
+
+def test_timeout_of_a_cancelled_reply_is_a_skip():
+    response = build(requests.Timeout)
+    response.send_messages()
+
+    assert response.skipped_messages == response.message_list
+
+
+@pytest.mark.parametrize("error", [CircuitOpenError, PermissionError])
+def test_other_errors_of_a_cancelled_reply_are_raised(error):
+    response = build(error)
+    with pytest.raises(error):
+        response.send_messages()
+
+    assert response.skipped_messages == []
+
+
+def test_empty_scheduled_reply_is_released():
+    registry = ReplyRegistry()
+    with OutboundScheduler(workers=1) as scheduler:
+        response = FailingResponse(
+            sender_uid="1", account_pid="PID", account_token="token",
+            scheduler=scheduler, reply_registry=registry)
+        response.send_messages()
+
+    assert registry.supersede("PID", "1") == 0
+
+
+def test_private_keys_are_not_posted(monkeypatch):
+    posted = []
+
+    def fake_graph_request(*args, json=None, **kwargs):
+        posted.append(json)
+        return None
+
+    monkeypatch.setattr(wa_response, "graph_request", fake_graph_request)
+    message = {"type": "text", "text": {"body": "hola"}, "_deadline": 1.0,
+               "_fragment_ids": [1, 2], "_standard_message": {}}
+
+    FailingResponse(
+        sender_uid="1", account_pid="PID", account_token="token"
+    ).send_message(message)
+
+    assert posted == [{"type": "text", "text": {"body": "hola"}}]
+
+
+class GraphResponse(WhatsAppResponse):
+
+    def _get_parameters(self) -> dict:
+        return {}
+
+    def _send_message(self, message: dict):
+        return self.send_message(message)
+
+
+def slow_reply(fake_api: FakeGraphApi, registry, uid: str, **kwargs):
+    response = GraphResponse(
+        sender_uid=uid, account_pid="PID", account_token="token",
+        base_url=fake_api.url, circuit_breakers=registry, **kwargs)
+    response.message_text("hola")
+    return response
+
+
+def test_deadline_timeouts_do_not_open_the_circuit():
+    registry = CircuitBreakerRegistry(min_calls=5, window_size=5)
+    with FakeGraphApi(FakeGraphApiConfig(latency=0.2)) as fake_api:
+        for uid in range(5):
+            response = slow_reply(fake_api, registry, str(uid))
+            response.set_deadline(0.05)
+            response.send_messages()
+            assert response.skipped_messages == response.message_list
+
+        assert registry.states()[("PID", "messages")] == CLOSED
+        live = slow_reply(fake_api, registry, "live")
+        live.send_messages()
+
+    assert fake_api.counters[("messages", 200)] == 6
+
+
+def test_request_timeouts_still_open_the_circuit():
+    registry = CircuitBreakerRegistry(min_calls=2, window_size=2)
+    with FakeGraphApi(FakeGraphApiConfig(latency=0.2)) as fake_api:
+        for uid in range(2):
+            response = slow_reply(
+                fake_api, registry, str(uid), request_timeout=0.05)
+            response.set_deadline(5)
+            with pytest.raises(requests.Timeout):
+                response.send_messages()
+
+    assert registry.states()[("PID", "messages")] == OPEN
+
+
+class RecordingResponse(WhatsAppResponse):
+    sent: list = []
+
+    def _get_parameters(self) -> dict:
+        return {}
+
+    def _send_message(self, message: dict):
+        self.sent.append(message["text"]["body"])
+
+
+def test_expired_fragment_is_not_merged():
+    response = RecordingResponse(
+        sender_uid="1", account_pid="PID", account_token="token",
+        coalesce_text=True)
+    response.message_text("a")
+    response.message_text("b")
+    response.set_deadline(-1, response.message_list[1])
+
+    response.send_messages()
+
+    assert response.sent == ["a"]
+    assert [m["text"]["body"] for m in response.skipped_messages] == ["b"]
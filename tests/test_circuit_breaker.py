@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from yeeko_abc_message_models.response.cancellation import ReplyRegistry
+from yeeko_abc_message_models.utils.circuit_breaker import (
+    OPEN, CircuitBreakerRegistry, CircuitOpenError, DeferralQueue)
+from yeeko_abc_message_models.whatsapp_message.graph_api import graph_request
+from yeeko_abc_message_models.whatsapp_message.request import (
+    get_file_content)
+from yeeko_abc_message_models.whatsapp_message.response import WhatsAppResponse
+
+
+class GraphResponse(WhatsAppResponse):
+
+    def _get_parameters(self) -> dict:
+        return {}
+
+    def _send_message(self, message: dict):
+        return self.send_message(message)
+
+
+def open_registry(
+    deferral=None, endpoint: str = "messages"
+) -> CircuitBreakerRegistry:
+    registry = CircuitBreakerRegistry(
+        deferral=deferral, min_calls=1, window_size=1)
+    registry.get("PID", endpoint).record(False)
+    assert registry.states()[("PID", endpoint)] == OPEN
+    return registry
+
+
+def test_deferred_message_is_reported_and_checked_again_on_drain():
+    deferral = DeferralQueue()
+    registry = open_registry(deferral)
+    replies = ReplyRegistry()
+    response = GraphResponse(
+        sender_uid="1", account_pid="PID", account_token="token",
+        circuit_breakers=registry, reply_registry=replies)
+    response.message_text("hola")
+    response.set_deadline(0.05)
+
+    response.send_messages()
+
+    assert response.deferred_messages == response.message_list
+    assert response.skipped_messages == []
+    assert len(deferral) == 1
+    # still registered, a newer inbound message can supersede it
+    assert replies.supersede("PID", "1") == 1
+
+    time.sleep(0.06)
+    deferral.drain(registry)
+
+    assert response.deferred_messages == []
+    assert response.skipped_messages == response.message_list
+
+
+def test_drain_defers_again_while_the_circuit_is_open():
+    deferral = DeferralQueue()
+    registry = open_registry(deferral)
+    response = GraphResponse(
+        sender_uid="1", account_pid="PID", account_token="token",
+        circuit_breakers=registry)
+    response.message_text("hola")
+    response.send_messages()
+
+    deferral.drain(registry)
+
+    assert response.deferred_messages == response.message_list
+    assert len(deferral) == 1
+
+
+def test_listeners_run_outside_the_breaker_lock():
+    registry = CircuitBreakerRegistry(min_calls=1, window_size=1)
+    seen = []
+
+    def listener(key, previous, state):
+        seen.append((state, registry.get(*key).allow()))
+
+    registry.add_listener(listener)
+    thread = threading.Thread(
+        target=registry.get("PID", "messages").record, args=(False,),
+        daemon=True)
+    thread.start()
+    thread.join(timeout=1)
+
+    assert not thread.is_alive()
+    assert seen == [(OPEN, False)]
+
+
+def test_account_pid_is_required_with_circuit_breakers():
+    with pytest.raises(ValueError):
+        graph_request(
+            "get", "http://localhost/media", None, "media_metadata",
+            CircuitBreakerRegistry())
+
+
+def test_full_deferral_queue_refuses_the_message():
+    deferral = DeferralQueue(max_size=1)
+    registry = open_registry(deferral)
+    replies = ReplyRegistry()
+    responses = []
+    for uid in ("1", "2"):
+        response = GraphResponse(
+            sender_uid=uid, account_pid="PID", account_token="token",
+            circuit_breakers=registry, reply_registry=replies)
+        response.message_text("hola")
+        responses.append(response)
+
+    responses[0].send_messages()
+    with pytest.raises(CircuitOpenError):
+        responses[1].send_messages()
+
+    assert len(deferral) == 1
+    assert deferral.rejected == 1
+    assert responses[1].deferred_messages == []
+    assert replies.supersede("PID", "2") == 0
+
+
+def test_media_download_fails_fast_on_open_circuit():
+    deferral = DeferralQueue()
+    registry = open_registry(deferral, endpoint="media_metadata")
+
+    with pytest.raises(CircuitOpenError):
+        get_file_content(
+            "media1", "token", circuit_breakers=registry, account_pid="PID")
+    assert len(deferral) == 0
@@ -0,0 +1,71 @@
+from yeeko_abc_message_models.whatsapp_message.response import (
+    MAX_TEXT_BODY_LENGTH, WhatsAppResponse)
+
+
+class RecordingResponse(WhatsAppResponse):
+
+    def _get_parameters(self) -> dict:
+        return {}
+
+    def _send_message(self, message: dict):
+        pass
+
+
+def build(*bodies: str, **kwargs) -> RecordingResponse:
+    response = RecordingResponse(
+        sender_uid="1", account_pid="PID", account_token="token", **kwargs)
+    for fragment_id, body in enumerate(bodies, start=1):
+        response.message_text(body, fragment_id=fragment_id)
+    return response
+
+
+def test_merge_up_to_the_body_limit():
+    # the separator takes two characters
+    first = "a" * 2000
+    fits = build(first, "b" * (MAX_TEXT_BODY_LENGTH - 2002))
+    too_long = build(first, "b" * (MAX_TEXT_BODY_LENGTH - 2001))
+
+    assert fits.coalesce_messages() == 1
+    assert len(fits.message_list[0]["text"]["body"]) == MAX_TEXT_BODY_LENGTH
+    assert too_long.coalesce_messages() == 0
+    assert len(too_long.message_list) == 2
+
+
+def test_non_text_message_breaks_the_run():
+    response = build("a", "b")
+    response.message_multimedia("image", url_media="https://x/a.png")
+    response.message_text("c")
+    response.message_text("d")
+
+    assert response.coalesce_messages() == 2
+    assert [message["type"] for message in response.message_list] == [
+        "text", "image", "text"]
+    assert response.message_list[0]["text"]["body"] == "a\n\nb"
+    assert response.message_list[2]["text"]["body"] == "c\n\nd"
+
+
+def test_fragment_ids_accumulate():
+    response = build("a", "b", "c", "d")
+
+    assert response.coalesce_messages() == 3
+    message, = response.message_list
+    assert message["text"]["body"] == "a\n\nb\n\nc\n\nd"
+    assert message["_fragment_ids"] == [1, 2, 3, 4]
+    assert message["_standard_message"]["body"] == message["text"]["body"]
+
+
+def test_preview_url_blocks_the_merge():
+    response = build("a", "https://example.com")
+    response.message_list[1]["text"]["preview_url"] = True
+
+    assert response.coalesce_messages() == 0
+    assert len(response.message_list) == 2
+
+
+def test_saved_calls_are_not_counted_twice():
+    response = build("a", "b", "c", coalesce_text=True)
+    response.coalesce_messages()
+    response.send_messages()
+
+    assert response.saved_calls == 2
+    assert len(response.message_list) == 1
@@ -0,0 +1,59 @@
+import pytest
+
+from yeeko_abc_message_models.whatsapp_message.request import WhatsAppRequest
+
+from .webhooks import status, webhook
+
+np = pytest.importorskip("numpy")
+
+from yeeko_abc_message_models.request.columnar import (  # noqa: E402
+    ColumnarWriter, StatusColumns, load_chunks)
+
+
+def requests():
+    return [
+        WhatsAppRequest(webhook("A", statuses=[
+            status("u1", "m1", "sent", 100),
+            status("u1", "m1", "delivered", 101),
+            status("u2", "m2", "sent", 100),
+        ])),
+        WhatsAppRequest(webhook("A", statuses=[
+            status("u1", "m1", "read", 130),
+            status("u2", "m2", "read", 110),
+        ])),
+        WhatsAppRequest(webhook("B", statuses=[
+            status("u1", "m3", "sent", 10),
+            status("u1", "m4", "read", 20),
+        ])),
+    ]
+
+
+def test_status_counts_and_latency():
+    columns = StatusColumns.from_requests(requests())
+
+    assert len(columns) == 7
+    assert columns.status_counts_by_account()["A"] == {
+        "sent": 2, "delivered": 1, "read": 2}
+    assert sorted(columns.status_latency(pid="A").tolist()) == [10, 30]
+
+
+def test_read_rate_counts_messages_without_sent_event():
+    columns = StatusColumns.from_requests(requests())
+
+    # m4 was only seen as read, it still counts as a delivered message
+    assert columns.read_rate_by_account() == {"A": 1.0, "B": 0.5}
+
+
+def test_chunks_round_trip(tmp_path):
+    with ColumnarWriter(str(tmp_path), chunk_size=3) as writer:
+        for request in requests():
+            writer.add(request)
+
+    loaded = load_chunks(writer.paths)
+    expected = StatusColumns.from_requests(requests())
+
+    assert len(writer.paths) == 2
+    assert loaded.status_counts_by_account() == \
+        expected.status_counts_by_account()
+    assert loaded.decode("message_id").tolist() == \
+        expected.decode("message_id").tolist()
@@ -0,0 +1,52 @@
+from yeeko_abc_message_models.request.delivery import DeliveryTracker
+from yeeko_abc_message_models.request.message_model import EventMessage
+
+
+def event(message_id: str, status: str, timestamp: int) -> EventMessage:
+    return EventMessage(
+        message_id=message_id, timestamp=timestamp, status=status, emoji=None)
+
+
+class FakeClock:
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_late_status_fills_timestamp_without_regressing():
+    tracker = DeliveryTracker()
+
+    assert tracker.update(event("m1", "read", 130))
+    assert not tracker.update(event("m1", "sent", 100))
+
+    assert tracker.state("m1") == "read"
+    assert tracker.get("m1").sent_at == 100
+    assert tracker.time_to_read("m1") == 30
+
+
+def test_records_expire_after_ttl():
+    clock = FakeClock()
+    tracker = DeliveryTracker(ttl=10, clock=clock)
+    tracker.update(event("m1", "sent", 100))
+
+    clock.now = 10
+    assert "m1" in tracker
+    clock.now = 21
+    assert tracker.get("m1") is None
+    assert len(tracker) == 0
+
+
+def test_least_recently_updated_record_is_evicted():
+    tracker = DeliveryTracker(max_size=2)
+    tracker.update(event("m1", "sent", 100))
+    tracker.update(event("m2", "sent", 100))
+    tracker.update(event("m1", "delivered", 101))
+    tracker.update(event("m3", "sent", 102))
+
+    assert len(tracker) == 2
+    assert tracker.state("m1") == "delivered"
+    assert tracker.state("m2") is None
+    assert tracker.state("m3") == "sent"
@@ -0,0 +1,69 @@
+import random
+import socket
+import time
+
+import requests
+
+from yeeko_abc_message_models.testing.fake_graph_api import (
+    FakeGraphApi, FakeGraphApiConfig)
+from yeeko_abc_message_models.whatsapp_message.request import get_file_content
+
+
+def test_messages_endpoint_returns_a_message_id():
+    config = FakeGraphApiConfig(record_messages=True)
+    with FakeGraphApi(config) as fake_api:
+        response = requests.post(
+            f"{fake_api.url}/PID/messages",
+            json={"to": "1", "type": "text", "text": {"body": "hola"}})
+
+    assert response.status_code == 200
+    assert response.json()["messages"][0]["id"].startswith("wamid.fake.")
+    assert fake_api.messages == [
+        ("PID", {"to": "1", "type": "text", "text": {"body": "hola"}})]
+    assert fake_api.counters == {("messages", 200): 1}
+
+
+def test_failure_rates_follow_the_seed():
+    config = FakeGraphApiConfig(error_rate=0.2, rate_limit_rate=0.3, seed=7)
+    with FakeGraphApi(config) as fake_api:
+        statuses = [
+            requests.post(f"{fake_api.url}/PID/messages", json={}).status_code
+            for _ in range(50)
+        ]
+
+    expected_random = random.Random(7)
+    expected = []
+    for _ in range(50):
+        value = expected_random.random()
+        expected.append(429 if value < 0.3 else 500 if value < 0.5 else 200)
+    assert statuses == expected
+    assert fake_api.counters[("messages", 429)] == expected.count(429)
+    assert fake_api.counters[("messages", 500)] == expected.count(500)
+
+
+def test_media_metadata_and_download(monkeypatch):
+    config = FakeGraphApiConfig(media_content=b"image bytes")
+    with FakeGraphApi(config) as fake_api:
+        monkeypatch.setenv("FACEBOOK_API_URL", fake_api.url)
+        content = get_file_content("media1", "token")
+
+    assert content == b"image bytes"
+    assert fake_api.counters == {
+        ("media_metadata", 200): 1, ("media_download", 200): 1}
+
+
+def test_client_disconnects_are_not_reported(capsys):
+    config = FakeGraphApiConfig(latency=0.2)
+    with FakeGraphApi(config) as fake_api:
+        for _ in range(3):
+            client = socket.create_connection(
+                fake_api._server.server_address[:2])
+            client.sendall(
+                b"POST /v13.0/PID/messages HTTP/1.1\r\n"
+                b"Content-Length: 2\r\n\r\n{}")
+            client.setsockopt(
+                socket.SOL_SOCKET, socket.SO_LINGER, b"\1\0\0\0\0\0\0\0")
+            client.close()
+        time.sleep(0.4)
+
+    assert "Traceback" not in capsys.readouterr().err
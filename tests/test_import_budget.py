@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# parsing-only workers import the request side; pydantic accounts for most
+# of the modules, the http client must not be among them
+IMPORT_SECONDS_BUDGET = 1.0
+IMPORTED_MODULES_BUDGET = 200
+
+SCRIPT = """
+import json, sys, time
+before = set(sys.modules)
+started = time.perf_counter()
+import yeeko_abc_message_models.whatsapp_message.request
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": elapsed,
+    "modules": sorted(set(sys.modules) - before),
+}))
+"""
+
+
+def run_import():
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_request_import_does_not_load_http_client():
+    modules = run_import()["modules"]
+
+    assert "requests" not in modules
+    assert "urllib3" not in modules
+
+
+def test_request_import_budget():
+    result = run_import()
+
+    assert result["seconds"] < IMPORT_SECONDS_BUDGET
+    assert len(result["modules"]) < IMPORTED_MODULES_BUDGET
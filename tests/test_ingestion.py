@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+from yeeko_abc_message_models.request.ingestion import (
+    OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_REJECT, WebhookIngestor)
+from yeeko_abc_message_models.whatsapp_message.request import WhatsAppRequest
+
+from .webhooks import text_message, webhook
+
+
+class GatedHandler:
+    # holds the single worker on its first webhook until the gate opens
+
+    def __init__(self) -> None:
+        self.gate = threading.Event()
+        self.busy = threading.Event()
+        self.message_ids = []
+
+    def __call__(self, request: WhatsAppRequest) -> None:
+        self.busy.set()
+        self.gate.wait(timeout=5)
+        message = request.input_accounts[0].members[0].messages[0]
+        self.message_ids.append(message.message_id)
+
+
+def hook(message_id: str) -> dict:
+    return webhook(messages=[text_message("1", message_id)])
+
+
+def fill(overflow: str) -> tuple:
+    handler = GatedHandler()
+    ingestor = WebhookIngestor(
+        WhatsAppRequest, handler, workers=1, max_queue=2, overflow=overflow,
+        block_timeout=0.05).start()
+    assert ingestor.submit(hook("m1"))
+    assert handler.busy.wait(timeout=5)
+    assert ingestor.submit(hook("m2"))
+    assert ingestor.submit(hook("m3"))
+    return ingestor, handler
+
+
+@pytest.mark.parametrize("overflow, accepted, expected", [
+    (OVERFLOW_REJECT, False, ["m1", "m2", "m3"]),
+    (OVERFLOW_BLOCK, False, ["m1", "m2", "m3"]),
+    (OVERFLOW_DROP_OLDEST, True, ["m1", "m3", "m4"]),
+])
+def test_overflow_policies(overflow, accepted, expected):
+    ingestor, handler = fill(overflow)
+
+    assert ingestor.submit(hook("m4")) is accepted
+    handler.gate.set()
+    ingestor.stop()
+
+    dropped = 1 if overflow == OVERFLOW_DROP_OLDEST else 0
+    assert handler.message_ids == expected
+    counters = ingestor.metrics()
+    assert counters["accepted"] == 3 + accepted
+    assert counters["rejected"] == 1 - accepted
+    assert counters["dropped"] == dropped
+    assert counters["processed"] == 3
+    assert counters["failed"] == 0
+
+
+def test_block_waits_for_room():
+    ingestor, handler = fill(OVERFLOW_BLOCK)
+    ingestor.block_timeout = 5
+    threading.Timer(0.05, handler.gate.set).start()
+
+    assert ingestor.submit(hook("m4"))
+    ingestor.stop()
+    assert handler.message_ids == ["m1", "m2", "m3", "m4"]
+
+
+def test_malformed_bodies_count_as_failed():
+    ingestor = WebhookIngestor(WhatsAppRequest, lambda request: None).start()
+
+    assert ingestor.submit(b"{not json")
+    ingestor.stop()
+
+    counters = ingestor.metrics()
+    assert counters["failed"] == 1
+    assert counters["processed"] == 0
+    assert ingestor.errors[0]["method"] == "_process"
+
+
+def test_stop_without_drain_drops_queued_webhooks():
+    ingestor, handler = fill(OVERFLOW_REJECT)
+    threading.Timer(0.05, handler.gate.set).start()
+
+    ingestor.stop(drain=False)
+
+    assert handler.message_ids == ["m1"]
+    assert ingestor.metrics()["dropped"] == 2
+
+
+def test_submit_after_stop_is_rejected():
+    ingestor, handler = fill(OVERFLOW_DROP_OLDEST)
+    stopper = threading.Thread(target=ingestor.stop)
+    stopper.start()
+    time.sleep(0.05)
+
+    # the queue is full, dropping now could discard a stop sentinel
+    assert not ingestor.submit(hook("m4"))
+    handler.gate.set()
+    stopper.join(timeout=5)
+
+    assert not stopper.is_alive()
+    assert handler.message_ids == ["m1", "m2", "m3"]
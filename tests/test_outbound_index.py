@@ -0,0 +1,101 @@
+from yeeko_abc_message_models.response.models import (
+    Button, ReplyMessage, Section, SectionsMessage)
+from yeeko_abc_message_models.response.outbound_index import (
+    OutboundIndex, OutboundRecord)
+from yeeko_abc_message_models.testing.fake_graph_api import (
+    FakeGraphApi, FakeGraphApiConfig)
+from yeeko_abc_message_models.whatsapp_message.request import WhatsAppRequest
+from yeeko_abc_message_models.whatsapp_message.response import WhatsAppResponse
+
+from .webhooks import text_message, webhook
+
+
+def button_reply(sender: str, message_id: str, payload: str) -> dict:
+    return {
+        "from": sender, "id": message_id, "timestamp": "1700000000",
+        "type": "interactive", "interactive": {
+            "type": "button_reply",
+            "button_reply": {"id": payload, "title": "Sí"},
+        },
+    }
+
+
+def parse(index: OutboundIndex, pid: str, message: dict):
+    request = WhatsAppRequest(
+        webhook(pid=pid, messages=[message]), outbound_index=index)
+    return request.input_accounts[0].members[0].messages[0]
+
+
+def test_outbound_is_not_serialized():
+    index = OutboundIndex()
+    index.add(OutboundRecord(mid="out1", account_pid="PID", sender_uid="1"))
+
+    message = parse(index, "PID", text_message("1", "in1", context={
+        "id": "out1"}))
+
+    assert message.outbound.mid == "out1"
+    assert "outbound" not in message.model_dump()
+    assert "outbound" not in message.model_dump_json()
+
+
+def test_payloads_are_keyed_per_account():
+    index = OutboundIndex()
+    index.add(OutboundRecord(
+        mid="out1", account_pid="PID1", sender_uid="1", uuid_list=["yes"]))
+
+    assert parse(index, "PID1", button_reply("1", "in1", "yes")).outbound
+    assert parse(index, "PID2", button_reply("1", "in2", "yes")).outbound \
+        is None
+
+
+def test_lookups_refresh_recency():
+    index = OutboundIndex(max_size=2)
+    index.add(OutboundRecord(mid="a", account_pid="PID", sender_uid="1"))
+    index.add(OutboundRecord(mid="b", account_pid="PID", sender_uid="1"))
+
+    assert index.get_by_mid("a") is not None
+    index.add(OutboundRecord(mid="c", account_pid="PID", sender_uid="1"))
+
+    assert index.get_by_mid("a") is not None
+    assert index.get_by_mid("b") is None
+
+
+class GraphResponse(WhatsAppResponse):
+
+    def _get_parameters(self) -> dict:
+        return {}
+
+    def _send_message(self, message: dict):
+        return self.send_message(message)
+
+
+def send_interactive(fake_api: FakeGraphApi, index: OutboundIndex):
+    response = GraphResponse(
+        sender_uid="1", account_pid="PID", account_token="token",
+        base_url=fake_api.url, outbound_index=index)
+    response.message_few_buttons(ReplyMessage(body="¿Sí?", buttons=[
+        Button(title="Sí", payload="yes")]))
+    response.message_sections(SectionsMessage(
+        body="Menú", button_text="Ver", sections=[Section(
+            title="Platos", buttons=[Button(title="Sopa", payload="soup")])]))
+    response.send_messages()
+
+
+def test_uuid_list_is_indexed_but_not_posted():
+    index = OutboundIndex()
+    with FakeGraphApi(FakeGraphApiConfig(record_messages=True)) as fake_api:
+        send_interactive(fake_api, index)
+
+    assert [body["type"] for _, body in fake_api.messages] == [
+        "interactive", "interactive"]
+    assert all("uuid_list" not in body for _, body in fake_api.messages)
+    assert index.get_by_payload("PID", "1", "yes") is not None
+    assert index.get_by_payload("PID", "1", "soup") is not None
+
+
+def test_failed_sends_are_not_indexed():
+    index = OutboundIndex()
+    with FakeGraphApi(FakeGraphApiConfig(error_rate=1.0)) as fake_api:
+        send_interactive(fake_api, index)
+
+    assert len(index) == 0
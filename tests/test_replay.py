@@ -0,0 +1,66 @@
+import json
+
+from yeeko_abc_message_models.testing.replay import replay_webhooks
+from yeeko_abc_message_models.whatsapp_message.request import WhatsAppRequest
+from yeeko_abc_message_models.whatsapp_message.response import WhatsAppResponse
+
+from .webhooks import status, text_message, webhook
+
+
+class RecordingResponse(WhatsAppResponse):
+
+    def _get_parameters(self) -> dict:
+        return {}
+
+    def _send_message(self, message: dict):
+        pass
+
+
+def write_records(path, payloads):
+    with open(path, "w") as file:
+        for payload in payloads:
+            file.write(json.dumps(payload) + "\n")
+
+
+def test_failed_webhook_is_counted_not_raised(tmp_path):
+    path = tmp_path / "hooks.jsonl"
+    write_records(path, [
+        webhook(messages=[text_message("1", f"in{i}")]) for i in range(3)])
+
+    calls = []
+
+    def factory(request, input_account, input_sender):
+        calls.append(input_sender.uid)
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        response = RecordingResponse(
+            sender_uid=input_sender.uid, account_pid=input_account.pid,
+            account_token="token")
+        response.message_text("hola")
+        return response
+
+    report = replay_webhooks(str(path), WhatsAppRequest, factory, speed=0)
+
+    assert report.webhooks == 3
+    assert report.failed_webhooks == 1
+    assert report.messages_sent == 2
+    assert "boom" in report.failures[0]["error"]
+
+
+def test_request_kwargs_reach_the_request_class(tmp_path):
+    path = tmp_path / "hooks.jsonl"
+    write_records(path, [webhook(statuses=[
+        status("1", "m1", "sent"), status("1", "m1", "delivered")])])
+
+    events = []
+
+    def factory(request, input_account, input_sender):
+        events.extend(input_sender.messages)
+        return None
+
+    report = replay_webhooks(
+        str(path), WhatsAppRequest, factory, speed=0,
+        request_kwargs={"compact_statuses": True})
+
+    assert report.failed_webhooks == 0
+    assert [event.status for event in events] == ["delivered"]
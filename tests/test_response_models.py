@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+from yeeko_abc_message_models.response.models import (
+    Button, Header, ReplyMessage, Section, SectionHeader, SectionsMessage)
+from yeeko_abc_message_models.whatsapp_message.response import WhatsAppResponse
+
+# message_list produced before replace_text and _standard_message were
+# optimized, the output must stay byte for byte the same
+EXPECTED = Path(__file__).parent / "data" / "response_messages.json"
+
+
+class ParametersResponse(WhatsAppResponse):
+
+    def _get_parameters(self) -> dict:
+        return {"name": "Ana", "items": [3, 4], "user": {"city": "Puebla"}}
+
+    def _send_message(self, message: dict):
+        pass
+
+
+def build_messages() -> list:
+    response = ParametersResponse(
+        sender_uid="5215512345678", account_pid="PID", account_token="token")
+    response.message_text(
+        "Hola  {{name}},\n  bienvenida a {{user.city}} {{missing}}",
+        fragment_id=1)
+    response.message_multimedia(
+        "image", url_media="https://x/img.png", caption=" Foto de {{name}} ",
+        fragment_id=2)
+    response.message_few_buttons(ReplyMessage(
+        body="¿Sigues en {{user.city}}?",
+        header=Header(type="image", value="https://x/{{name}}.png"),
+        footer="  pie  ", fragment_id=3,
+        buttons=[
+            Button(title="Sí {{name}}", payload="yes"),
+            Button(title="No", payload="no", description="d {{items.count}}"),
+        ]))
+    response.message_many_buttons(ReplyMessage(
+        body="Elige", header="Encabezado {{name}}", fragment_id=4,
+        buttons=[SectionHeader(title="Grupo {{name}}")] + [
+            Button(title=f"Opción {i}", payload=f"p{i}") for i in range(6)
+        ] + [SectionHeader(title="Otro")] + [
+            Button(title=f"Más {i}", payload=f"m{i}", description=f"desc {i}")
+            for i in range(8)
+        ]))
+    response.message_sections(SectionsMessage(
+        body="Lista {{items.first}}",
+        button_text="Ver {{name}} opciones largas de más", fragment_id=5,
+        sections=[Section(title="S{{items.last}}", buttons=[
+            Button(title="A", payload="a"),
+            Button(title="B {{name}}", payload="b", description="x"),
+        ])]))
+    return response.message_list
+
+
+def test_message_list_is_unchanged():
+    expected = json.loads(EXPECTED.read_text(encoding="utf-8"))
+
+    assert json.loads(json.dumps(build_messages())) == expected
+
+
+def test_replace_text_normalizes_unchanged_fields():
+    message = ReplyMessage(body="  sin   parámetros ", buttons=[
+        Button(title="Uno", payload="1")])
+
+    message.replace_text({})
+
+    assert message.body == "sin parámetros"
+    assert message.buttons[0].description == ""
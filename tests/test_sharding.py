@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from yeeko_abc_message_models.request.sharding import ConsistentHashRouter
+from yeeko_abc_message_models.whatsapp_message.request import WhatsAppRequest
+
+from .webhooks import text_message, webhook
+
+KEYS = [("PID", str(uid)) for uid in range(5000)]
+WORKERS = ["w0", "w1", "w2", "w3"]
+
+
+def routes(router: ConsistentHashRouter) -> dict:
+    return {key: router.route(*key) for key in KEYS}
+
+
+def test_routing_is_stable_across_instances():
+    # blake2b, not hash(), so other processes route the same way
+    assert routes(ConsistentHashRouter(WORKERS)) == \
+        routes(ConsistentHashRouter(reversed(WORKERS)))
+
+
+def test_adding_a_worker_only_moves_keys_to_it():
+    router = ConsistentHashRouter(WORKERS)
+    before = routes(router)
+    router.add_worker("w4")
+    after = routes(router)
+
+    moved = [key for key in KEYS if before[key] != after[key]]
+    assert all(after[key] == "w4" for key in moved)
+    assert 0.1 < len(moved) / len(KEYS) < 0.3
+
+
+def test_removing_a_worker_only_moves_its_keys():
+    router = ConsistentHashRouter(WORKERS)
+    before = routes(router)
+    router.remove_worker("w2")
+    after = routes(router)
+
+    assert {
+        key for key in KEYS if before[key] != after[key]
+    } == {key for key in KEYS if before[key] == "w2"}
+
+
+def test_concurrent_rebuilds_keep_every_worker():
+    router = ConsistentHashRouter(replicas=20)
+    threads = [
+        threading.Thread(target=router.add_worker, args=(f"w{number}",))
+        for number in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(router.workers) == sorted(f"w{n}" for n in range(16))
+
+
+def test_split_groups_conversations_by_worker():
+    router = ConsistentHashRouter(WORKERS)
+    request = WhatsAppRequest(webhook(messages=[
+        text_message(str(uid), f"m{uid}") for uid in range(20)]))
+
+    shards = router.split(request)
+
+    assert sum(len(pairs) for pairs in shards.values()) == 20
+    for worker, pairs in shards.items():
+        for input_account, input_sender in pairs:
+            assert router.route(input_account.pid, input_sender.uid) == worker
+
+
+def test_route_without_workers_raises():
+    with pytest.raises(ValueError):
+        ConsistentHashRouter().route("PID", "1")
@@ -0,0 +1,41 @@
+import pytest
+
+from yeeko_abc_message_models.request.delivery import DeliveryTracker
+from yeeko_abc_message_models.whatsapp_message.request import WhatsAppRequest
+
+from .webhooks import status, webhook
+
+
+def compacted_request() -> WhatsAppRequest:
+    return WhatsAppRequest(webhook(statuses=[
+        status("u1", "m1", "sent", 100),
+        status("u1", "m1", "delivered", 101),
+        status("u1", "m1", "read", 130),
+    ]), compact_statuses=True)
+
+
+def test_compaction_keeps_the_dropped_timestamps():
+    request = compacted_request()
+    events = request.input_accounts[0].members[0].messages
+
+    assert request.compacted_statuses == 2
+    assert [event.status for event in events] == ["read"]
+    assert events[0].earlier_statuses == {"sent": 100, "delivered": 101}
+
+
+def test_tracker_reads_compacted_statuses():
+    tracker = DeliveryTracker()
+    tracker.feed_account(compacted_request().input_accounts[0])
+
+    assert tracker.state("m1") == "read"
+    assert tracker.time_to_read("m1") == 30
+
+
+def test_columns_read_compacted_statuses():
+    pytest.importorskip("numpy")
+    from yeeko_abc_message_models.request.columnar import StatusColumns
+
+    columns = StatusColumns.from_requests([compacted_request()])
+
+    assert columns.read_rate_by_account() == {"PID": 1.0}
+    assert columns.latency_percentiles()["p50"] == 30
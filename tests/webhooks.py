@@ -0,0 +1,26 @@
+def text_message(sender: str, message_id: str, body: str = "hola",
+                 timestamp: int = 1700000000, **extra) -> dict:
+    return {
+        "from": sender, "id": message_id, "timestamp": str(timestamp),
+        "type": "text", "text": {"body": body}, **extra
+    }
+
+
+def status(recipient: str, message_id: str, status: str,
+           timestamp: int = 1700000000) -> dict:
+    return {
+        "id": message_id, "recipient_id": recipient, "status": status,
+        "timestamp": str(timestamp)
+    }
+
+
+def webhook(pid: str = "PID", messages=(), statuses=(), contacts=()) -> dict:
+    return {"entry": [{"changes": [{"value": {
+        "metadata": {"phone_number_id": pid},
+        "contacts": [
+            {"profile": {"name": "Test"}, "wa_id": wa_id}
+            for wa_id in contacts
+        ],
+        "messages": list(messages),
+        "statuses": list(statuses),
+    }}]}]}
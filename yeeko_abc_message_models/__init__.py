@@ -0,0 +1,9 @@
+import importlib
+
+_SUBMODULES = {"request", "response", "testing", "utils", "whatsapp_message"}
+
+
+def __getattr__(name: str):
+    if name not in _SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
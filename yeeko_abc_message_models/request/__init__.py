@@ -55,14 +55,17 @@ class RequestAbc(ABC):
     input_accounts: List[InputAccount]
     debug: bool = False
     errors: list[dict]
+    outbound_index: Any = None
 
     def __init__(
-            self, raw_data: dict, debug: bool = False
+            self, raw_data: dict, debug: bool = False,
+            outbound_index: Any = None
     ) -> None:
         self.raw_data = raw_data
         self.input_accounts = []
         self.debug = debug
         self.errors = []
+        self.outbound_index = outbound_index
 
         try:
             self.sort_data()
@@ -85,6 +88,22 @@ class RequestAbc(ABC):
     ) -> TextMessage | InteractiveMessage | EventMessage | MediaMessage:
         raise NotImplementedError
 
+    def attach_outbound(
+        self,
+        message: TextMessage | InteractiveMessage | EventMessage | MediaMessage,
+        account_pid: str,
+        sender_uid: str
+    ) -> None:
+        if self.outbound_index is None:
+            return
+        mid = message.context_id
+        if isinstance(message, EventMessage) and message.status == "reaction":
+            mid = message.message_id
+        payload = message.payload \
+            if isinstance(message, InteractiveMessage) else None
+        message.outbound = self.outbound_index.resolve(
+            account_pid, sender_uid, mid=mid, payload=payload)
+
     def get_input_account(
         self, pid: str, raw_data: dict
     ) -> InputAccount:
@@ -0,0 +1,285 @@
+"""
+Columnar export of the EventMessage statuses of parsed requests.
+
+String columns (pid, uid, message_id, status) are dictionary encoded:
+an int32 code array plus the list of distinct values. Requires numpy
+(pip install yeeko_abc_message_models[analytics]).
+"""
+import os
+from typing import Dict, Iterable, List, Optional
+
+from . import RequestAbc
+from .delivery import STATUS_RANK
+from .message_model import EventMessage
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+ENCODED_COLUMNS = ("pid", "uid", "message_id", "status")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(
+            "numpy is required for columnar export, install "
+            "yeeko_abc_message_models[analytics]"
+        )
+
+
+class _DictionaryEncoder:
+    def __init__(self, values: Optional[List[str]] = None) -> None:
+        self.values: List[str] = list(values or [])
+        self.index: Dict[str, int] = {
+            value: code for code, value in enumerate(self.values)}
+        self.codes: List[int] = []
+
+    def encode(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: str) -> None:
+        self.codes.append(self.encode(value))
+
+
+class StatusColumns:
+    pid: "np.ndarray"
+    uid: "np.ndarray"
+    message_id: "np.ndarray"
+    status: "np.ndarray"
+    timestamp: "np.ndarray"
+    values: Dict[str, List[str]]
+
+    def __init__(self, columns: Dict[str, "np.ndarray"], values: dict) -> None:
+        _require_numpy()
+        self.pid = columns["pid"]
+        self.uid = columns["uid"]
+        self.message_id = columns["message_id"]
+        self.status = columns["status"]
+        self.timestamp = columns["timestamp"]
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @classmethod
+    def from_requests(cls, requests: Iterable[RequestAbc]) -> "StatusColumns":
+        _require_numpy()
+        encoders = {name: _DictionaryEncoder() for name in ENCODED_COLUMNS}
+        timestamps: List[int] = []
+
+        def add(pid: str, uid: str, event: EventMessage):
+            # compacted events carry the statuses folded into them
+            statuses = list(event.earlier_statuses.items())
+            statuses.append((event.status, event.timestamp))
+            for status, timestamp in statuses:
+                encoders["pid"].append(pid or "")
+                encoders["uid"].append(uid or "")
+                encoders["message_id"].append(event.message_id)
+                encoders["status"].append(status)
+                timestamps.append(int(timestamp))
+
+        for request in requests:
+            for input_account in request.input_accounts:
+                for event in input_account.statuses:
+                    add(input_account.pid, "", event)
+                for member in input_account.members:
+                    for message in member.messages:
+                        if isinstance(message, EventMessage):
+                            add(input_account.pid, member.uid, message)
+
+        columns = {
+            name: np.array(encoder.codes, dtype=np.int32)
+            for name, encoder in encoders.items()
+        }
+        columns["timestamp"] = np.array(timestamps, dtype=np.int64)
+        return cls(columns, {
+            name: encoder.values for name, encoder in encoders.items()})
+
+    @classmethod
+    def concat(cls, chunks: List["StatusColumns"]) -> "StatusColumns":
+        _require_numpy()
+        columns: Dict[str, list] = {name: [] for name in ENCODED_COLUMNS}
+        columns["timestamp"] = []
+        encoders = {name: _DictionaryEncoder() for name in ENCODED_COLUMNS}
+
+        for chunk in chunks:
+            for name in ENCODED_COLUMNS:
+                # remap the chunk dictionary codes into the merged dictionary
+                mapping = np.array(
+                    [encoders[name].encode(v) for v in chunk.values[name]],
+                    dtype=np.int32)
+                codes = getattr(chunk, name)
+                columns[name].append(mapping[codes] if len(codes) else codes)
+            columns["timestamp"].append(chunk.timestamp)
+
+        merged = {
+            name: np.concatenate(arrays) if arrays else np.array(
+                [], dtype=np.int64 if name == "timestamp" else np.int32)
+            for name, arrays in columns.items()
+        }
+        return cls(merged, {
+            name: encoder.values for name, encoder in encoders.items()})
+
+    def save(self, path: str) -> None:
+        arrays = {
+            name: getattr(self, name)
+            for name in ENCODED_COLUMNS + ("timestamp",)
+        }
+        for name in ENCODED_COLUMNS:
+            arrays[f"{name}_values"] = np.array(self.values[name], dtype=str)
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "StatusColumns":
+        _require_numpy()
+        with np.load(path) as data:
+            columns = {
+                name: data[name] for name in ENCODED_COLUMNS + ("timestamp",)}
+            values = {
+                name: data[f"{name}_values"].tolist()
+                for name in ENCODED_COLUMNS
+            }
+        return cls(columns, values)
+
+    def decode(self, name: str) -> "np.ndarray":
+        return np.array(self.values[name], dtype=str)[getattr(self, name)]
+
+    def _status_code(self, status: str) -> int:
+        try:
+            return self.values["status"].index(status)
+        except ValueError:
+            return -1
+
+    def status_counts_by_account(self) -> Dict[str, Dict[str, int]]:
+        # counts distinct message_ids per (pid, status)
+        n_status = len(self.values["status"])
+        n_messages = len(self.values["message_id"])
+        keys = (self.pid.astype(np.int64) * n_status + self.status) \
+            * n_messages + self.message_id
+        unique_keys = np.unique(keys)
+        pid_status = unique_keys // max(n_messages, 1)
+        counts = np.bincount(
+            pid_status, minlength=len(self.values["pid"]) * n_status
+        ).reshape(len(self.values["pid"]), n_status)
+
+        return {
+            pid: {
+                status: int(counts[pid_code, status_code])
+                for status_code, status in enumerate(self.values["status"])
+                if counts[pid_code, status_code]
+            }
+            for pid_code, pid in enumerate(self.values["pid"])
+        }
+
+    def _distinct_messages_by_account(self, statuses) -> "np.ndarray":
+        codes = [
+            code for code, status in enumerate(self.values["status"])
+            if status in statuses
+        ]
+        n_messages = max(len(self.values["message_id"]), 1)
+        mask = np.isin(self.status, codes)
+        keys = np.unique(
+            self.pid[mask].astype(np.int64) * n_messages
+            + self.message_id[mask])
+        return np.bincount(
+            keys // n_messages, minlength=len(self.values["pid"]))
+
+    def read_rate_by_account(self) -> Dict[str, float]:
+        # read messages over the distinct messages with any delivery status,
+        # a message only seen as read (e.g. compacted statuses) still counts
+        tracked = self._distinct_messages_by_account(STATUS_RANK)
+        read = self._distinct_messages_by_account({"read"})
+        return {
+            pid: float(read[code] / tracked[code]) if tracked[code] else 0.0
+            for code, pid in enumerate(self.values["pid"])
+        }
+
+    def status_latency(
+        self, from_status: str = "sent", to_status: str = "read",
+        pid: Optional[str] = None
+    ) -> "np.ndarray":
+        # seconds between the first from_status and the first to_status of
+        # every message that has both
+        from_code = self._status_code(from_status)
+        to_code = self._status_code(to_status)
+        n_messages = len(self.values["message_id"])
+        empty = np.iinfo(np.int64).max
+        if from_code < 0 or to_code < 0:
+            return np.array([], dtype=np.int64)
+
+        mask = np.ones(len(self), dtype=bool)
+        if pid is not None:
+            if pid not in self.values["pid"]:
+                return np.array([], dtype=np.int64)
+            mask = self.pid == self.values["pid"].index(pid)
+
+        first = {}
+        for code in (from_code, to_code):
+            selected = mask & (self.status == code)
+            times = np.full(n_messages, empty, dtype=np.int64)
+            np.minimum.at(
+                times, self.message_id[selected], self.timestamp[selected])
+            first[code] = times
+
+        both = (first[from_code] != empty) & (first[to_code] != empty)
+        return first[to_code][both] - first[from_code][both]
+
+    def latency_percentiles(
+        self, percentiles=(50, 90, 99), **kwargs
+    ) -> Dict[str, float]:
+        latencies = self.status_latency(**kwargs)
+        if not len(latencies):
+            return {}
+        values = np.percentile(latencies, percentiles)
+        return {f"p{q}": float(v) for q, v in zip(percentiles, values)}
+
+
+class ColumnarWriter:
+    """Buffers parsed requests and writes a .npz chunk every chunk_size rows."""
+    directory: str
+    chunk_size: int
+    paths: List[str]
+
+    def __init__(self, directory: str, chunk_size: int = 100_000) -> None:
+        _require_numpy()
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.paths = []
+        self._pending: List[StatusColumns] = []
+        self._pending_rows = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, request: RequestAbc) -> None:
+        columns = StatusColumns.from_requests([request])
+        if not len(columns):
+            return
+        self._pending.append(columns)
+        self._pending_rows += len(columns)
+        if self._pending_rows >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> Optional[str]:
+        if not self._pending:
+            return None
+        path = os.path.join(
+            self.directory, f"statuses_{len(self.paths):06d}.npz")
+        StatusColumns.concat(self._pending).save(path)
+        self.paths.append(path)
+        self._pending = []
+        self._pending_rows = 0
+        return path
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+
+def load_chunks(paths: Iterable[str]) -> StatusColumns:
+    return StatusColumns.concat([StatusColumns.load(path) for path in paths])
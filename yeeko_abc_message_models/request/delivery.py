@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from . import InputAccount, InputSender
+from .message_model import EventMessage
+
+# order of the delivery statuses, a status never moves a message backwards
+STATUS_RANK = {
+    "sent": 1,
+    "delivered": 2,
+    "read": 3,
+    "failed": 4,
+}
+
+
+class DeliveryRecord:
+    __slots__ = (
+        "message_id", "recipient", "state",
+        "sent_at", "delivered_at", "read_at", "failed_at", "touched",
+    )
+
+    def __init__(self, message_id: str, recipient: Optional[str]) -> None:
+        self.message_id = message_id
+        self.recipient = recipient
+        self.state: Optional[str] = None
+        self.sent_at: Optional[int] = None
+        self.delivered_at: Optional[int] = None
+        self.read_at: Optional[int] = None
+        self.failed_at: Optional[int] = None
+        self.touched = 0.0
+
+    @property
+    def time_to_read(self) -> Optional[int]:
+        if self.sent_at is None or self.read_at is None:
+            return None
+        return self.read_at - self.sent_at
+
+
+class DeliveryTracker:
+    """
+    Per message_id delivery state machine bounded by size (LRU) and ttl.
+    Statuses arriving late keep their timestamp but never regress the state.
+    """
+    max_size: int
+    ttl: Optional[float]
+
+    def __init__(
+        self, max_size: int = 100_000, ttl: Optional[float] = 3 * 24 * 3600,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._records: "OrderedDict[str, DeliveryRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, message_id: str) -> bool:
+        return self.get(message_id) is not None
+
+    def update(
+        self, event: EventMessage, recipient: Optional[str] = None
+    ) -> bool:
+        # returns True when the event advanced the state of the message
+        rank = STATUS_RANK.get(event.status)
+        if rank is None or not event.message_id:
+            return False
+
+        now = self._clock()
+        with self._lock:
+            record = self._records.get(event.message_id)
+            if record is None:
+                record = DeliveryRecord(event.message_id, recipient)
+                self._records[event.message_id] = record
+            else:
+                self._records.move_to_end(event.message_id)
+            record.touched = now
+
+            timestamps = dict(event.earlier_statuses)
+            timestamps[event.status] = event.timestamp
+            for status, timestamp in timestamps.items():
+                attribute = f"{status}_at"
+                if status in STATUS_RANK and getattr(record, attribute) is None:
+                    setattr(record, attribute, int(timestamp))
+
+            advanced = rank > STATUS_RANK.get(record.state or "", 0)
+            if advanced:
+                record.state = event.status
+            self._evict(now)
+        return advanced
+
+    def feed_sender(self, input_sender: InputSender) -> int:
+        return sum(
+            self.update(message, recipient=input_sender.uid)
+            for message in input_sender.messages
+            if isinstance(message, EventMessage)
+        )
+
+    def feed_account(self, input_account: InputAccount) -> int:
+        advanced = sum(self.update(event) for event in input_account.statuses)
+        for member in input_account.members:
+            advanced += self.feed_sender(member)
+        return advanced
+
+    def get(self, message_id: str) -> Optional[DeliveryRecord]:
+        with self._lock:
+            record = self._records.get(message_id)
+            if record is None:
+                return None
+            if self._expired(record, self._clock()):
+                del self._records[message_id]
+                return None
+            return record
+
+    def state(self, message_id: str) -> Optional[str]:
+        record = self.get(message_id)
+        return record.state if record else None
+
+    def time_to_read(self, message_id: str) -> Optional[int]:
+        record = self.get(message_id)
+        return record.time_to_read if record else None
+
+    def _expired(self, record: DeliveryRecord, now: float) -> bool:
+        return self.ttl is not None and now - record.touched > self.ttl
+
+    def _evict(self, now: float) -> None:
+        # records are kept in touch order, so only the head can be stale
+        records = self._records
+        while len(records) > self.max_size:
+            records.popitem(last=False)
+        while records:
+            oldest = next(iter(records.values()))
+            if not self._expired(oldest, now):
+                break
+            records.popitem(last=False)
+
+
+# statuses that always reach the handlers, even when compacting
+UNCOMPACTED_STATUSES = {"failed", "reaction"}
+
+
+class StatusCompactionWindow:
+    """
+    Remembers the most advanced status emitted per (recipient, message_id)
+    for `seconds`, so a later webhook repeating or regressing it is dropped.
+    """
+    seconds: float
+    max_size: int
+
+    def __init__(
+        self, seconds: float = 5.0, max_size: int = 100_000,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.seconds = seconds
+        self.max_size = max_size
+        self._clock = clock
+        self._emitted: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def should_emit(self, key: tuple, rank: int) -> bool:
+        now = self._clock()
+        with self._lock:
+            emitted = self._emitted
+            while emitted:
+                _, emitted_at = next(iter(emitted.values()))
+                if now - emitted_at <= self.seconds:
+                    break
+                emitted.popitem(last=False)
+
+            previous = emitted.get(key)
+            if previous is not None and previous[0] >= rank:
+                return False
+
+            emitted[key] = (rank, now)
+            emitted.move_to_end(key)
+            while len(emitted) > self.max_size:
+                emitted.popitem(last=False)
+        return True
+
+
+def compact_sender_statuses(
+    input_sender: InputSender,
+    window: Optional[StatusCompactionWindow] = None
+) -> int:
+    # keeps only the most advanced delivery status per message_id, returns
+    # the number of events dropped. The timestamps of the dropped statuses
+    # are kept in earlier_statuses of the remaining event, DeliveryTracker
+    # and StatusColumns read them; statuses dropped by the window were
+    # already emitted with an earlier webhook.
+    def is_compactable(message) -> bool:
+        return isinstance(message, EventMessage) and \
+            message.status in STATUS_RANK and \
+            message.status not in UNCOMPACTED_STATUSES
+
+    best: dict = {}
+    for index, message in enumerate(input_sender.messages):
+        if not is_compactable(message):
+            continue
+        rank = STATUS_RANK[message.status]
+        current = best.get(message.message_id)
+        if current is None or rank >= current[0]:
+            best[message.message_id] = (rank, index)
+
+    keep = {
+        index for message_id, (rank, index) in best.items()
+        if window is None or window.should_emit(
+            (input_sender.uid, message_id), rank)
+    }
+
+    messages = []
+    for index, message in enumerate(input_sender.messages):
+        if index in keep or not is_compactable(message):
+            messages.append(message)
+            continue
+        kept_index = best[message.message_id][1]
+        if kept_index not in keep or kept_index == index:
+            continue
+        kept = input_sender.messages[kept_index]
+        if message.status == kept.status:
+            continue
+        earlier = kept.earlier_statuses
+        if message.status not in earlier or \
+                message.timestamp < earlier[message.status]:
+            earlier[message.status] = message.timestamp
+
+    dropped = len(input_sender.messages) - len(messages)
+    input_sender.messages = messages
+    return dropped
@@ -0,0 +1,186 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Type
+
+from yeeko_abc_message_models.utils.stats import summarize
+
+from . import RequestAbc
+
+OVERFLOW_REJECT = "reject"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_BLOCK = "block"
+
+_STOP = object()
+
+
+class WebhookIngestor:
+    """
+    Accepts raw webhook bodies and returns immediately so the http view can
+    ack right away; a pool of worker threads parses them with request_class
+    and calls handler(request).
+
+    When the queue is full the overflow policy decides: "reject" returns
+    False (answer 503 so the platform redelivers later), "drop_oldest"
+    discards the oldest queued webhook and "block" waits up to block_timeout
+    before rejecting. Once stop() has begun every submit is rejected.
+    """
+    request_class: Type[RequestAbc]
+    handler: Callable[[RequestAbc], Any]
+    workers: int
+    overflow: str
+
+    def __init__(
+        self,
+        request_class: Type[RequestAbc],
+        handler: Callable[[RequestAbc], Any],
+        workers: int = 4,
+        max_queue: int = 1000,
+        overflow: str = OVERFLOW_REJECT,
+        block_timeout: float = 1.0,
+        request_kwargs: Optional[Dict[str, Any]] = None,
+        metrics_window: int = 10_000,
+    ) -> None:
+        if overflow not in (
+                OVERFLOW_REJECT, OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK):
+            raise ValueError(f"Overflow policy {overflow} not supported")
+
+        self.request_class = request_class
+        self.handler = handler
+        self.workers = workers
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.request_kwargs = request_kwargs or {}
+        self.errors: Deque[dict] = deque(maxlen=100)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._counters = {
+            "accepted": 0, "rejected": 0, "dropped": 0,
+            "processed": 0, "failed": 0,
+        }
+        self._queue_latencies: Deque[float] = deque(maxlen=metrics_window)
+        self._processing_times: Deque[float] = deque(maxlen=metrics_window)
+
+    def start(self) -> "WebhookIngestor":
+        self._stopping = False
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"webhook-ingestor-{number}",
+                daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, drain: bool = True) -> None:
+        # taken under the lock so no _drop_oldest can discard a _STOP
+        with self._lock:
+            self._stopping = True
+        if drain:
+            self._queue.join()
+        else:
+            self._clear()
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def join(self) -> None:
+        self._queue.join()
+
+    def __enter__(self) -> "WebhookIngestor":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def submit(self, raw: bytes | str | dict) -> bool:
+        if self._stopping:
+            self._count("rejected")
+            return False
+        item = (raw, time.perf_counter())
+        try:
+            if self.overflow == OVERFLOW_BLOCK:
+                self._queue.put(item, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            if self.overflow != OVERFLOW_DROP_OLDEST or \
+                    not self._drop_oldest(item):
+                self._count("rejected")
+                return False
+
+        self._count("accepted")
+        return True
+
+    def _drop_oldest(self, item: tuple) -> bool:
+        with self._lock:
+            if self._stopping:
+                return False
+            while True:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self._counters["dropped"] += 1
+                except queue.Empty:
+                    pass
+                try:
+                    self._queue.put_nowait(item)
+                    return True
+                except queue.Full:
+                    continue
+
+    def _clear(self) -> None:
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._queue.task_done()
+            self._count("dropped")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _work(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            raw, enqueued_at = item
+            started = time.perf_counter()
+            try:
+                self._process(raw)
+                self._count("processed")
+            except Exception as e:
+                self._count("failed")
+                self.errors.append({"method": "_process", "error": str(e)})
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._queue_latencies.append(started - enqueued_at)
+                    self._processing_times.append(finished - started)
+                self._queue.task_done()
+
+    def _process(self, raw: bytes | str | dict) -> None:
+        raw_data = raw if isinstance(raw, dict) else json.loads(raw)
+        request = self.request_class(raw_data, **self.request_kwargs)
+        self.handler(request)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            queue_latencies = list(self._queue_latencies)
+            processing_times = list(self._processing_times)
+        return counters | {
+            "queue_depth": self._queue.qsize(),
+            "queue_latency": summarize(queue_latencies),
+            "processing_time": summarize(processing_times),
+        }
@@ -1,13 +1,16 @@
 import time
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
 
 
 class MessageBase(BaseModel):
     message_id: str
     timestamp: int
     context_id: Optional[str] = None
+    # OutboundRecord of the message this one replies to, when indexed; not
+    # part of the serialized message
+    outbound: Optional[Any] = Field(default=None, exclude=True)
 
     class Config:
         arbitrary_types_allowed = True
@@ -34,6 +37,9 @@ class InteractiveMessage(MessageBase):
 class EventMessage(MessageBase):
     status: str
     emoji: Optional[str]
+    # status -> timestamp of the earlier statuses folded into this event when
+    # the request compacts statuses
+    earlier_statuses: Dict[str, int] = {}
 
 
 class MediaMessage(MessageBase):
@@ -0,0 +1,85 @@
+import bisect
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from . import InputAccount, InputSender, RequestAbc
+
+# sorted point hashes, the worker owning each point, the workers
+_Ring = Tuple[Tuple[int, ...], Tuple[str, ...], Tuple[str, ...]]
+
+
+def _hash(value: str) -> int:
+    # stable across processes, unlike hash()
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRouter:
+    """
+    Maps each conversation (account pid, sender uid) to a fixed worker with
+    a consistent hash ring, so adding or removing a worker only moves about
+    1/n of the conversations.
+    """
+    replicas: int
+
+    def __init__(self, workers: Iterable[str] = (), replicas: int = 100):
+        self.replicas = replicas
+        # (hashes, owners, workers) replaced as a whole, route() reads it
+        # once without locking; rebuilds are serialized by _lock
+        self._ring: _Ring = ((), (), ())
+        self._lock = threading.Lock()
+        for worker in workers:
+            self.add_worker(worker)
+
+    @property
+    def workers(self) -> List[str]:
+        return list(self._ring[2])
+
+    def add_worker(self, worker: str) -> None:
+        with self._lock:
+            workers = self._ring[2]
+            if worker not in workers:
+                self._rebuild(workers + (worker,))
+
+    def remove_worker(self, worker: str) -> None:
+        with self._lock:
+            workers = self._ring[2]
+            if worker in workers:
+                self._rebuild(tuple(w for w in workers if w != worker))
+
+    def _rebuild(self, workers: Tuple[str, ...]) -> None:
+        points = sorted(
+            (_hash(f"{worker}#{replica}"), worker)
+            for worker in workers
+            for replica in range(self.replicas)
+        )
+        self._ring = (
+            tuple(point for point, _ in points),
+            tuple(worker for _, worker in points),
+            workers,
+        )
+
+    def route(self, pid: str, uid: str) -> str:
+        hashes, owners, _ = self._ring
+        if not hashes:
+            raise ValueError("No workers registered")
+        index = bisect.bisect(hashes, _hash(f"{pid}:{uid}"))
+        return owners[index % len(owners)]
+
+    def route_sender(
+        self, input_account: InputAccount, input_sender: InputSender
+    ) -> str:
+        return self.route(input_account.pid, input_sender.uid)
+
+    def split(
+        self, request: RequestAbc
+    ) -> Dict[str, List[Tuple[InputAccount, InputSender]]]:
+        # groups the conversations of a parsed request by worker
+        shards: Dict[str, List[Tuple[InputAccount, InputSender]]] = {}
+        for input_account in request.input_accounts:
+            for input_sender in input_account.members:
+                worker = self.route_sender(input_account, input_sender)
+                shards.setdefault(worker, []).append(
+                    (input_account, input_sender))
+        return shards
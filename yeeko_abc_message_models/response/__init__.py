@@ -1,13 +1,16 @@
-import json
+import sys
+import threading
+import time
 
 from abc import ABC, abstractmethod
-from pydantic import BaseModel
-from typing import Callable, List, Optional
+from pydantic import BaseModel, PrivateAttr
+from typing import Any, Callable, List, Optional
 
 from yeeko_abc_message_models.utils.parameters import replace_parameter
 
 from .models import (
     Message, ReplyMessage, SectionsMessage, MediaMessage)
+from .scheduler import PRIORITY_DEFAULT
 
 
 def exception_handler(func: Callable) -> Callable:
@@ -20,6 +23,13 @@ def exception_handler(func: Callable) -> Callable:
     return wrapper
 
 
+def _is_timeout(e: Exception) -> bool:
+    # requests is only imported by the platforms that send with it
+    requests = sys.modules.get("requests")
+    return isinstance(e, TimeoutError) or (
+        requests is not None and isinstance(e, requests.Timeout))
+
+
 class ResponseAbc(ABC, BaseModel):
     sender_uid: str
     account_pid: str
@@ -27,6 +37,24 @@ class ResponseAbc(ABC, BaseModel):
     message_list: List[dict] = []
     errors: List[dict] = []
     debug: bool = False
+    coalesce_text: bool = False
+    saved_calls: int = 0
+    # an OutboundScheduler, when set send_messages queues instead of sending
+    scheduler: Optional[Any] = None
+    priority: int = PRIORITY_DEFAULT
+    # an OutboundIndex filled with every message sent
+    outbound_index: Optional[Any] = None
+    # epoch seconds after which the remaining messages are not sent, a
+    # message can carry its own "_deadline" too
+    deadline: Optional[float] = None
+    skipped_messages: List[dict] = []
+    # messages held back by an open circuit, sent again on DeferralQueue.drain
+    deferred_messages: List[dict] = []
+    # a ReplyRegistry, lets a newer inbound message cancel this reply
+    reply_registry: Optional[Any] = None
+
+    _sending: Optional[dict] = PrivateAttr(default=None)
+    _cancelled: threading.Event = PrivateAttr(default_factory=threading.Event)
 
     class Config:
         arbitrary_types_allowed = True
@@ -45,8 +73,8 @@ class ResponseAbc(ABC, BaseModel):
         message = self._rep_text(message)
         message_data = self.text_to_data(message, fragment_id=fragment_id)
 
-        message_data["_standard_message"] = json.loads(
-            Message(body=message).model_dump_json())
+        message_data["_standard_message"] = Message(
+            body=message).model_dump(mode="json")
         self.message_list.append(message_data)
 
     def message_multimedia(
@@ -56,37 +84,141 @@ class ResponseAbc(ABC, BaseModel):
         caption = self._rep_text(caption)
         message_data = self.multimedia_to_data(
             url_media, media_id, media_type, caption, fragment_id=fragment_id)
-        message_data["_standard_message"] = json.loads(MediaMessage(
-            caption=caption, id=media_id, link=url_media).model_dump_json())
+        message_data["_standard_message"] = MediaMessage(
+            caption=caption, id=media_id, link=url_media
+        ).model_dump(mode="json")
         self.message_list.append(message_data)
 
     def message_few_buttons(self, message: ReplyMessage):
         message.replace_text(self._get_parameters())
 
         message_data = self.few_buttons_to_data(message)
-        message_data["_standard_message"] = json.loads(
-            message.model_dump_json())
+        message_data["_standard_message"] = message.model_dump(mode="json")
         self.message_list.append(message_data)
 
     def message_many_buttons(self, message: ReplyMessage):
         message.replace_text(self._get_parameters())
 
         message_data = self.many_buttons_to_data(message)
-        message_data["_standard_message"] = json.loads(
-            message.model_dump_json())
+        message_data["_standard_message"] = message.model_dump(mode="json")
         self.message_list.append(message_data)
 
     def message_sections(self, message: SectionsMessage):
         message.replace_text(self._get_parameters())
 
         message_data = self.sections_to_data(message)
-        message_data["_standard_message"] = json.loads(
-            message.model_dump_json())
+        message_data["_standard_message"] = message.model_dump(mode="json")
         self.message_list.append(message_data)
 
-    def send_messages(self):
+    def coalesce_messages(self, separator: str = "\n\n") -> int:
+        # merge adjacent plain-text messages, returns the number of api calls
+        # saved; the platform decides what can be merged in _merge_text_data
+        coalesced: List[dict] = []
+        saved = 0
+
         for message in self.message_list:
-            self._send_message(message)
+            if coalesced:
+                merged = self._merge_text_data(
+                    coalesced[-1], message, separator)
+                if merged is not None:
+                    coalesced[-1] = merged
+                    saved += 1
+                    continue
+            coalesced.append(message)
+
+        self.message_list = coalesced
+        self.saved_calls += saved
+        return saved
+
+    def _merge_text_data(
+        self, previous: dict, message: dict, separator: str
+    ) -> Optional[dict]:
+        # platforms without a safe text merge keep every message as is
+        return None
+
+    def set_deadline(self, seconds: float, message: Optional[dict] = None):
+        # without message the deadline applies to the whole response
+        deadline = time.time() + seconds
+        if message is None:
+            self.deadline = deadline
+        else:
+            message["_deadline"] = deadline
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def remaining_time(self, message: Optional[dict] = None) -> Optional[float]:
+        message = message if message is not None else self._sending
+        deadlines = [
+            deadline for deadline in (
+                self.deadline, (message or {}).get("_deadline"))
+            if deadline is not None
+        ]
+        if not deadlines:
+            return None
+        return min(deadlines) - time.time()
+
+    def _is_stale(self, message: dict) -> bool:
+        remaining = self.remaining_time(message)
+        return self.is_cancelled or (remaining is not None and remaining <= 0)
+
+    def send_messages(self):
+        if self.coalesce_text:
+            self.coalesce_messages()
+
+        if self.reply_registry is not None:
+            self.reply_registry.register(self)
+
+        if self.scheduler is not None:
+            if not self.message_list:
+                # nothing to queue, the scheduler would never release it
+                self._finish_sending()
+                return
+            self.scheduler.submit(self)
+            return
+
+        try:
+            for message in self.message_list:
+                self._dispatch(message)
+        finally:
+            self._finish_sending()
+
+    def _finish_sending(self):
+        # deferred messages can still be superseded by a newer inbound message
+        if self.reply_registry is not None and not self.deferred_messages:
+            self.reply_registry.release(self)
+
+    def _defer(self, message_data: dict) -> "DeferredMessage":
+        return DeferredMessage(self, self._sending or message_data)
+
+    def _dispatch(self, message: dict):
+        if self._is_stale(message):
+            self.skipped_messages.append(message)
+            return None
+
+        # _send_message may pre-clean the data, keep the original message
+        # around for _register_outbound and remaining_time
+        self._sending = message
+        try:
+            return self._send_message(message)
+        except Exception as e:
+            # a timeout derived from the deadline is a skip, not an error
+            if _is_timeout(e) and self._is_stale(message):
+                self.skipped_messages.append(message)
+                return None
+            raise
+        finally:
+            self._sending = None
+
+    def _register_outbound(self, message_data: dict, body: Optional[dict]):
+        if self.outbound_index is None:
+            return
+        self.outbound_index.record_sent(
+            self, self._sending or message_data, self.get_mid(body))
 
     @abstractmethod
     def _send_message(self, message: dict):
@@ -134,3 +266,29 @@ class ResponseAbc(ABC, BaseModel):
             print(data)
             raise e
         self.errors.append(data | {"error": str(e)})
+
+
+class DeferredMessage:
+    """
+    A message rejected by an open circuit, queued in a DeferralQueue with
+    its response so the retry checks the deadline and cancellation again.
+    """
+    __slots__ = ("key", "response", "message")
+
+    def __init__(self, response: ResponseAbc, message: dict) -> None:
+        self.key = (response.account_pid, "messages")
+        self.response = response
+        self.message = message
+
+    def mark(self) -> None:
+        self.response.deferred_messages.append(self.message)
+
+    def retry(self, registry: Any = None) -> Any:
+        # the send goes through the breakers again and may be deferred anew
+        response = self.response
+        if self.message in response.deferred_messages:
+            response.deferred_messages.remove(self.message)
+        try:
+            return response._dispatch(self.message)
+        finally:
+            response._finish_sending()
@@ -0,0 +1,55 @@
+import threading
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from yeeko_abc_message_models.request import RequestAbc
+from yeeko_abc_message_models.request.message_model import EventMessage
+
+if TYPE_CHECKING:
+    from . import ResponseAbc
+
+
+class ReplyRegistry:
+    """
+    Tracks the responses being sent per conversation (account_pid,
+    sender_uid) so a newer inbound message can cancel what is left of the
+    older replies.
+    """
+
+    def __init__(self) -> None:
+        self._active: Dict[Tuple[str, str], List["ResponseAbc"]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, response: "ResponseAbc") -> None:
+        key = (response.account_pid, response.sender_uid)
+        with self._lock:
+            self._active.setdefault(key, []).append(response)
+
+    def release(self, response: "ResponseAbc") -> None:
+        key = (response.account_pid, response.sender_uid)
+        with self._lock:
+            responses = self._active.get(key, [])
+            if response in responses:
+                responses.remove(response)
+            if not responses:
+                self._active.pop(key, None)
+
+    def supersede(self, account_pid: str, sender_uid: str) -> int:
+        # cancels every reply in flight for the conversation
+        with self._lock:
+            responses = self._active.pop((account_pid, sender_uid), [])
+        for response in responses:
+            response.cancel()
+        return len(responses)
+
+    def supersede_request(self, request: RequestAbc) -> int:
+        # statuses and reactions don't make a reply stale, new messages do
+        cancelled = 0
+        for input_account in request.input_accounts:
+            for input_sender in input_account.members:
+                if any(
+                    not isinstance(message, EventMessage)
+                    for message in input_sender.messages
+                ):
+                    cancelled += self.supersede(
+                        input_account.pid, input_sender.uid)
+        return cancelled
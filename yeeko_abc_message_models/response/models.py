@@ -4,6 +4,16 @@ from typing import List, Optional
 from yeeko_abc_message_models.utils.parameters import replace_parameter
 
 
+def _replace_field(
+    model: BaseModel, field: str, extra_values_data: dict, text: str
+) -> None:
+    # pydantic __setattr__ is the costly part of replace_text, most texts
+    # have no parameters so skip the assignment when nothing changed
+    value = replace_parameter(extra_values_data, text)
+    if value != getattr(model, field):
+        setattr(model, field, value)
+
+
 class Button(BaseModel):
     title: str
     payload: str
@@ -26,17 +36,17 @@ class Message(BaseModel):
     fragment_id: Optional[int] = None
 
     def replace_text(self, extra_values_data: dict):
-        self.body = replace_parameter(extra_values_data, self.body)
+        _replace_field(self, "body", extra_values_data, self.body)
 
         if self.header:
             if isinstance(self.header, Header):
-                self.header.value = replace_parameter(
-                    extra_values_data, self.header.value)
+                _replace_field(
+                    self.header, "value", extra_values_data, self.header.value)
             else:
-                self.header = replace_parameter(extra_values_data, self.header)
+                _replace_field(self, "header", extra_values_data, self.header)
 
         if self.footer:
-            self.footer = replace_parameter(extra_values_data, self.footer)
+            _replace_field(self, "footer", extra_values_data, self.footer)
 
 
 class ReplyMessage(Message):
@@ -46,6 +56,9 @@ class ReplyMessage(Message):
     def get_section(
             self, default_title="Opciones", available_button_space=10
     ) -> List["Section"]:
+        # fresh Sections on every call so callers can change them freely,
+        # they share the Button instances; Section() costs the same as
+        # model_construct and is a small part of message_many_buttons
         sections: List["Section"] = []
 
         actual_section = None
@@ -83,24 +96,20 @@ class ReplyMessage(Message):
 
         super().replace_text(extra_values_data)
 
-        self.button_text = replace_parameter(
-            extra_values_data, self.button_text)
+        _replace_field(
+            self, "button_text", extra_values_data, self.button_text)
 
-        for index, button in enumerate(self.buttons):
+        for button in self.buttons:
             if isinstance(button, Button):
-                self.buttons[index].title = replace_parameter(
-                    extra_values_data,
-                    button.title
-                )
-                self.buttons[index].description = replace_parameter(  # type: ignore
-                    extra_values_data,
+                _replace_field(
+                    button, "title", extra_values_data, button.title)
+                _replace_field(
+                    button, "description", extra_values_data,
                     button.description or ""
                 )
             if isinstance(button, SectionHeader):
-                self.buttons[index].title = replace_parameter(
-                    extra_values_data,
-                    button.title
-                )
+                _replace_field(
+                    button, "title", extra_values_data, button.title)
 
 
 class Section(BaseModel):
@@ -109,17 +118,14 @@ class Section(BaseModel):
 
     def replace_text(self, extra_values_data: dict):
 
-        self.title = replace_parameter(
-            extra_values_data, self.title)
+        _replace_field(self, "title", extra_values_data, self.title)
 
-        for index, button in enumerate(self.buttons):
+        for button in self.buttons:
             if isinstance(button, Button):
-                self.buttons[index].title = replace_parameter(
-                    extra_values_data,
-                    button.title
-                )
-                self.buttons[index].description = replace_parameter(
-                    extra_values_data,
+                _replace_field(
+                    button, "title", extra_values_data, button.title)
+                _replace_field(
+                    button, "description", extra_values_data,
                     button.description or ""
                 )
 
@@ -132,11 +138,11 @@ class SectionsMessage(Message):
     def replace_text(self, extra_values_data: dict):
         super().replace_text(extra_values_data)
 
-        self.button_text = replace_parameter(
-            extra_values_data, self.button_text)
+        _replace_field(
+            self, "button_text", extra_values_data, self.button_text)
 
-        for index, _ in enumerate(self.sections):
-            self.sections[index].replace_text(extra_values_data)
+        for section in self.sections:
+            section.replace_text(extra_values_data)
 
 
 class MediaMessage(BaseModel):
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Hashable, List, Optional
+
+if TYPE_CHECKING:
+    from . import ResponseAbc
+
+
+class OutboundRecord:
+    __slots__ = (
+        "mid", "account_pid", "sender_uid", "fragment_id", "fragment_ids",
+        "uuid_list", "sent_at",
+    )
+
+    def __init__(
+        self,
+        mid: Optional[str],
+        account_pid: str,
+        sender_uid: str,
+        fragment_id: Optional[int] = None,
+        fragment_ids: Optional[List[Optional[int]]] = None,
+        uuid_list: Optional[List[str]] = None,
+    ) -> None:
+        self.mid = mid
+        self.account_pid = account_pid
+        self.sender_uid = sender_uid
+        self.fragment_id = fragment_id
+        self.fragment_ids = fragment_ids or [fragment_id]
+        self.uuid_list = uuid_list or []
+        self.sent_at = time.time()
+
+    def __repr__(self) -> str:
+        return (
+            f"OutboundRecord(mid={self.mid!r}, "
+            f"fragment_id={self.fragment_id!r})"
+        )
+
+
+class OutboundIndex:
+    """
+    Bounded LRU mapping sent message ids and button payloads back to the
+    outbound message that produced them. Payloads are keyed per account and
+    sender since the same payload can be offered to many users, from more
+    than one account. Lookups refresh the recency of the entry they hit.
+    """
+    max_size: int
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, OutboundRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, record: OutboundRecord) -> None:
+        keys: List[Hashable] = [
+            (record.account_pid, record.sender_uid, payload)
+            for payload in record.uuid_list
+        ]
+        if record.mid:
+            keys.append(record.mid)
+
+        with self._lock:
+            for key in keys:
+                self._entries[key] = record
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def record_sent(
+        self, response: "ResponseAbc", message_data: dict, mid: Optional[str]
+    ) -> Optional[OutboundRecord]:
+        uuid_list = message_data.get("uuid_list") or []
+        if not mid and not uuid_list:
+            return None
+        fragment_id = message_data.get("_fragment_id")
+        record = OutboundRecord(
+            mid=mid,
+            account_pid=response.account_pid,
+            sender_uid=response.sender_uid,
+            fragment_id=fragment_id,
+            fragment_ids=message_data.get("_fragment_ids"),
+            uuid_list=uuid_list,
+        )
+        self.add(record)
+        return record
+
+    def _get(self, key: Hashable) -> Optional[OutboundRecord]:
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None:
+                self._entries.move_to_end(key)
+            return record
+
+    def get_by_mid(self, mid: str) -> Optional[OutboundRecord]:
+        return self._get(mid)
+
+    def get_by_payload(
+        self, account_pid: str, sender_uid: str, payload: str
+    ) -> Optional[OutboundRecord]:
+        return self._get((account_pid, sender_uid, payload))
+
+    def resolve(
+        self, account_pid: str, sender_uid: str, mid: Optional[str] = None,
+        payload: Optional[str] = None
+    ) -> Optional[OutboundRecord]:
+        # the replied message id is exact, the payload is the fallback
+        record = self.get_by_mid(mid) if mid else None
+        if record is None and payload:
+            record = self.get_by_payload(account_pid, sender_uid, payload)
+        return record
@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional
+
+from yeeko_abc_message_models.utils.stats import summarize
+
+if TYPE_CHECKING:
+    from . import ResponseAbc
+
+PRIORITY_LIVE = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_BULK = 2
+
+
+class _Job:
+    __slots__ = ("response", "index", "enqueued_at")
+
+    def __init__(self, response: "ResponseAbc", index: int) -> None:
+        self.response = response
+        self.index = index
+        self.enqueued_at = 0.0
+
+
+class _PriorityClass:
+    # weighted round robin between the accounts with queued messages
+    def __init__(self) -> None:
+        self.queues: Dict[str, Deque[_Job]] = {}
+        self.ring: Deque[str] = deque()
+        self.served: Dict[str, int] = {}
+        self.depth = 0
+
+    def push(self, job: _Job) -> None:
+        pid = job.response.account_pid
+        queue = self.queues.get(pid)
+        if queue is None:
+            queue = self.queues[pid] = deque()
+            self.ring.append(pid)
+            self.served[pid] = 0
+        queue.append(job)
+        self.depth += 1
+
+    def pop(self, weights: Dict[str, int]) -> _Job:
+        pid = self.ring[0]
+        queue = self.queues[pid]
+        job = queue.popleft()
+        self.depth -= 1
+        self.served[pid] += 1
+
+        if not queue:
+            self.ring.popleft()
+            del self.queues[pid]
+            del self.served[pid]
+        elif self.served[pid] >= weights.get(pid, 1):
+            self.served[pid] = 0
+            self.ring.rotate(-1)
+        return job
+
+
+class OutboundScheduler:
+    """
+    Sends the message_list of submitted responses from a pool of worker
+    threads. Lower priority values are always served first; inside a
+    priority, accounts share the workers by weight. Messages of the same
+    response keep their order: the next one is queued once the previous
+    has been sent.
+
+    Priorities are strict and there is no aging: while live or default
+    messages keep arriving, PRIORITY_BULK jobs wait indefinitely. Size the
+    workers so live traffic leaves spare capacity, or run broadcasts on
+    their own scheduler if they need a guaranteed share.
+
+    benchmarks/bench_scheduler.py measures live reply latency during a
+    broadcast.
+    """
+    workers: int
+    account_weights: Dict[str, int]
+
+    def __init__(
+        self, workers: int = 4,
+        account_weights: Optional[Dict[str, int]] = None,
+        metrics_window: int = 10_000,
+    ) -> None:
+        self.workers = workers
+        self.account_weights = account_weights or {}
+        self._classes: Dict[int, _PriorityClass] = {}
+        self._wait_times: Dict[int, Deque[float]] = {}
+        self._metrics_window = metrics_window
+        self._sent = 0
+        self._pending = 0
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+
+    def start(self) -> "OutboundScheduler":
+        self._stopped = False
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"outbound-scheduler-{number}",
+                daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        if wait:
+            self.join()
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        # waits until every submitted message has been sent
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending, timeout=timeout)
+
+    def __enter__(self) -> "OutboundScheduler":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def submit(self, response: "ResponseAbc") -> None:
+        if not response.message_list:
+            return
+        with self._condition:
+            self._pending += len(response.message_list)
+            self._push(_Job(response, 0))
+
+    def _push(self, job: _Job) -> None:
+        priority = job.response.priority
+        priority_class = self._classes.get(priority)
+        if priority_class is None:
+            priority_class = self._classes[priority] = _PriorityClass()
+            self._wait_times[priority] = deque(maxlen=self._metrics_window)
+        job.enqueued_at = time.perf_counter()
+        priority_class.push(job)
+        self._condition.notify()
+
+    def _pop(self) -> Optional[_Job]:
+        for priority in sorted(self._classes):
+            priority_class = self._classes[priority]
+            if priority_class.depth:
+                job = priority_class.pop(self.account_weights)
+                self._wait_times[priority].append(
+                    time.perf_counter() - job.enqueued_at)
+                return job
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                job = self._pop()
+                while job is None:
+                    if self._stopped:
+                        return
+                    self._condition.wait()
+                    job = self._pop()
+
+            response = job.response
+            try:
+                response._dispatch(response.message_list[job.index])
+            except Exception as e:
+                try:
+                    response.add_error({"method": "_dispatch"}, e=e)
+                except Exception:
+                    pass
+
+            if job.index + 1 >= len(response.message_list):
+                response._finish_sending()
+
+            with self._condition:
+                self._sent += 1
+                self._pending -= 1
+                job.index += 1
+                if job.index < len(response.message_list):
+                    self._push(job)
+                if not self._pending:
+                    self._condition.notify_all()
+
+    def queue_depth(self) -> Dict[int, int]:
+        with self._condition:
+            return {
+                priority: priority_class.depth
+                for priority, priority_class in self._classes.items()
+            }
+
+    def metrics(self) -> dict:
+        with self._condition:
+            wait_times = {
+                priority: list(values)
+                for priority, values in self._wait_times.items()
+            }
+            depth = {
+                priority: priority_class.depth
+                for priority, priority_class in self._classes.items()
+            }
+            sent, pending = self._sent, self._pending
+        return {
+            "sent": sent,
+            "pending": pending,
+            "queue_depth": depth,
+            "wait_time": {
+                priority: summarize(values)
+                for priority, values in wait_times.items()
+            },
+        }
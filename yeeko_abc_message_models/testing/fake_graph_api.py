@@ -0,0 +1,265 @@
+"""
+Local stand-in for the WhatsApp Graph API, meant for load tests.
+
+Point the FACEBOOK_API_URL environment variable (or
+WhatsAppResponse.base_url) to FakeGraphApi.url.
+"""
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+
+class FakeGraphApiConfig:
+    latency: float | Tuple[float, float]
+    error_rate: float
+    rate_limit_rate: float
+    media_content: bytes
+    media_mime_type: str
+    record_messages: bool
+
+    def __init__(
+        self,
+        latency: float | Tuple[float, float] = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        media_content: bytes = b"\0" * 1024,
+        media_mime_type: str = "image/jpeg",
+        record_messages: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        if error_rate + rate_limit_rate > 1:
+            raise ValueError("error_rate + rate_limit_rate must be <= 1")
+
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.media_content = media_content
+        self.media_mime_type = media_mime_type
+        self.record_messages = record_messages
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def get_latency(self) -> float:
+        if isinstance(self.latency, tuple):
+            with self._lock:
+                return self._random.uniform(*self.latency)
+        return self.latency
+
+    def get_failure(self) -> Optional[int]:
+        with self._lock:
+            value = self._random.random()
+        if value < self.rate_limit_rate:
+            return 429
+        if value < self.rate_limit_rate + self.error_rate:
+            return 500
+        return None
+
+
+class _GraphApiHandler(BaseHTTPRequestHandler):
+    server: "_GraphApiServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) < 2 or parts[-1] != "messages":
+            return self._send_json(404, _error_body("Unknown path", 803))
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, _error_body("Invalid JSON", 100))
+
+        endpoint = "read_status" if body.get("status") == "read" else "messages"
+        if self._fail(endpoint):
+            return
+
+        if endpoint == "read_status":
+            return self._send_json(200, {"success": True})
+
+        self.server.fake_api.record_message(parts[-2], body)
+        to = body.get("to")
+        self._send_json(200, {
+            "messaging_product": "whatsapp",
+            "contacts": [{"input": to, "wa_id": to}],
+            "messages": [{"id": f"wamid.fake.{uuid.uuid4().hex}"}],
+        })
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) >= 2 and parts[-2] == "media":
+            return self._media_download(parts[-1])
+        if not parts or not parts[-1]:
+            return self._send_json(404, _error_body("Unknown path", 803))
+        self._media_metadata(parts[-1])
+
+    def _media_metadata(self, media_id: str):
+        if self._fail("media_metadata"):
+            return
+        config = self.server.fake_api.config
+        self._send_json(200, {
+            "messaging_product": "whatsapp",
+            "id": media_id,
+            "url": f"{self.server.fake_api.root_url}/media/{media_id}",
+            "mime_type": config.media_mime_type,
+            "sha256": hashlib.sha256(config.media_content).hexdigest(),
+            "file_size": len(config.media_content),
+        })
+
+    def _media_download(self, media_id: str):
+        if self._fail("media_download"):
+            return
+        content = self.server.fake_api.config.media_content
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _fail(self, endpoint: str) -> bool:
+        fake_api = self.server.fake_api
+        latency = fake_api.config.get_latency()
+        if latency:
+            time.sleep(latency)
+
+        status = fake_api.config.get_failure()
+        fake_api.count(endpoint, status or 200)
+        if status == 429:
+            self._send_json(429, _error_body(
+                "(#130429) Rate limit hit", 130429))
+        elif status:
+            self._send_json(status, _error_body("Service unavailable", 2))
+        return status is not None
+
+    def _send_json(self, status: int, body: dict):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class _GraphApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    fake_api: "FakeGraphApi"
+
+    def handle_error(self, request, client_address):
+        # clients giving up on a slow response (timeouts) are expected under
+        # load, anything else still prints its traceback
+        error = sys.exc_info()[1]
+        if isinstance(error, (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def _error_body(message: str, code: int) -> dict:
+    return {"error": {
+        "message": message,
+        "type": "OAuthException",
+        "code": code,
+        "fbtrace_id": uuid.uuid4().hex,
+    }}
+
+
+class FakeGraphApi:
+    config: FakeGraphApiConfig
+    api_version: str
+    counters: Counter
+    messages: List[Tuple[str, dict]]
+
+    def __init__(
+        self,
+        config: Optional[FakeGraphApiConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        api_version: str = "v13.0",
+    ) -> None:
+        self.config = config or FakeGraphApiConfig()
+        self.api_version = api_version
+        self.counters = Counter()
+        self.messages = []
+        self._lock = threading.Lock()
+        self._server = _GraphApiServer((host, port), _GraphApiHandler)
+        self._server.fake_api = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self) -> str:
+        return f"{self.root_url}/{self.api_version}"
+
+    def count(self, endpoint: str, status: int) -> None:
+        with self._lock:
+            self.counters[(endpoint, status)] += 1
+
+    def record_message(self, phone_number_id: str, body: dict) -> None:
+        if not self.config.record_messages:
+            return
+        with self._lock:
+            self.messages.append((phone_number_id, body))
+
+    def start(self) -> "FakeGraphApi":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def serve_forever(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def __enter__(self) -> "FakeGraphApi":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake_api = FakeGraphApi(
+        FakeGraphApiConfig(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+        ),
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Fake Graph API listening on {fake_api.url}")
+    try:
+        fake_api.serve_forever()
+    except KeyboardInterrupt:
+        pass
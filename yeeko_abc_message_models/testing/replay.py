@@ -0,0 +1,166 @@
+"""
+Replay recorded webhooks through a RequestAbc / ResponseAbc pair.
+
+Each line of the JSONL file is either a raw webhook payload or an object
+{"received_at": <epoch seconds>, "payload": {...}}; received_at is used to
+reproduce the original pacing, divided by the speed multiplier.
+"""
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Type)
+
+from yeeko_abc_message_models.request import (
+    InputAccount, InputSender, RequestAbc)
+from yeeko_abc_message_models.response import ResponseAbc
+from yeeko_abc_message_models.utils.stats import summarize
+
+ResponseFactory = Callable[
+    [RequestAbc, InputAccount, InputSender], Optional[ResponseAbc]]
+
+
+class ReplayReport:
+    webhooks: int
+    failed_webhooks: int
+    failures: Deque[dict]
+    responses: int
+    messages_sent: int
+    request_errors: int
+    response_errors: int
+    duration: float
+    latencies: List[float]
+    service_times: List[float]
+
+    def __init__(self) -> None:
+        self.webhooks = 0
+        self.failed_webhooks = 0
+        self.failures = deque(maxlen=100)
+        self.responses = 0
+        self.messages_sent = 0
+        self.request_errors = 0
+        self.response_errors = 0
+        self.duration = 0.0
+        self.latencies = []
+        self.service_times = []
+        self._lock = threading.Lock()
+
+    @property
+    def throughput(self) -> float:
+        return self.webhooks / self.duration if self.duration else 0.0
+
+    def add(
+        self, request: RequestAbc, responses: List[ResponseAbc],
+        latency: float, service_time: float
+    ) -> None:
+        with self._lock:
+            self.webhooks += 1
+            self.responses += len(responses)
+            self.request_errors += len(request.errors)
+            for response in responses:
+                self.messages_sent += len(response.message_list)
+                self.response_errors += len(response.errors)
+            self.latencies.append(latency)
+            self.service_times.append(service_time)
+
+    def add_failure(self, e: Exception, latency: float) -> None:
+        with self._lock:
+            self.webhooks += 1
+            self.failed_webhooks += 1
+            self.failures.append({"error": repr(e)})
+            self.latencies.append(latency)
+
+    def as_dict(self) -> dict:
+        return {
+            "webhooks": self.webhooks,
+            "failed_webhooks": self.failed_webhooks,
+            "responses": self.responses,
+            "messages_sent": self.messages_sent,
+            "request_errors": self.request_errors,
+            "response_errors": self.response_errors,
+            "duration": self.duration,
+            "throughput": self.throughput,
+            "latency": summarize(self.latencies),
+            "service_time": summarize(self.service_times),
+        }
+
+
+def read_records(path: str) -> Iterator[Tuple[Optional[float], dict]]:
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "payload" in record:
+                yield record.get("received_at"), record["payload"]
+            else:
+                yield None, record
+
+
+def replay_webhooks(
+    path: str,
+    request_class: Type[RequestAbc],
+    response_factory: ResponseFactory,
+    speed: float = 1.0,
+    workers: int = 1,
+    limit: Optional[int] = None,
+    request_kwargs: Optional[Dict[str, Any]] = None,
+) -> ReplayReport:
+    """
+    speed=2 replays twice as fast as recorded, speed=0 ignores the recorded
+    pacing. Latency is measured from the scheduled arrival of each webhook,
+    so it includes any time spent waiting for a free worker. A webhook whose
+    parsing, factory or send raises is counted in failed_webhooks.
+    """
+    report = ReplayReport()
+    request_kwargs = request_kwargs or {}
+
+    def process(payload: dict, scheduled: float) -> None:
+        started = time.perf_counter()
+        try:
+            request = request_class(payload, **request_kwargs)
+            responses = []
+            for input_account in request.input_accounts:
+                for input_sender in input_account.members:
+                    response = response_factory(
+                        request, input_account, input_sender)
+                    if response is None:
+                        continue
+                    response.send_messages()
+                    responses.append(response)
+        except Exception as e:
+            report.add_failure(e, latency=time.perf_counter() - scheduled)
+            return
+        finished = time.perf_counter()
+        report.add(
+            request, responses,
+            latency=finished - scheduled, service_time=finished - started)
+
+    first_received: Optional[float] = None
+    replay_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for index, (received_at, payload) in enumerate(read_records(path)):
+            if limit is not None and index >= limit:
+                break
+
+            scheduled = time.perf_counter()
+            if speed and received_at is not None:
+                if first_received is None:
+                    first_received = received_at
+                scheduled = replay_start + (received_at - first_received) / speed
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            futures.append(executor.submit(process, payload, scheduled))
+
+        for future in futures:
+            future.result()
+
+    report.duration = time.perf_counter() - replay_start
+    return report
@@ -0,0 +1,267 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BreakerKey = Tuple[str, str]
+TransitionListener = Callable[[BreakerKey, str, str], None]
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, key: BreakerKey) -> None:
+        super().__init__(f"Circuit open for account {key[0]}, {key[1]}")
+        self.key = key
+
+
+class CircuitBreaker:
+    """
+    Opens when the failure rate of the last window_size calls reaches
+    failure_rate_threshold; calls slower than slow_call_seconds count as
+    failures. After open_seconds it lets half_open_calls trial calls through
+    and closes again only if all of them succeed.
+    """
+
+    def __init__(
+        self,
+        key: BreakerKey,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: Optional[float] = None,
+        window_size: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+        on_transition: Optional[TransitionListener] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.key = key
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._on_transition = on_transition
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        transition = None
+        with self._lock:
+            allowed = True
+            if self.state == OPEN:
+                if self._clock() - self._opened_at < self.open_seconds:
+                    return False
+                transition = self._transition(HALF_OPEN)
+
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    allowed = False
+                else:
+                    self._trials += 1
+        self._notify(transition)
+        return allowed
+
+    def release(self) -> None:
+        # the call gave no verdict on the endpoint, frees its half open trial
+        with self._lock:
+            if self.state == HALF_OPEN and self._trials:
+                self._trials -= 1
+
+    def record(self, success: bool, duration: float = 0.0) -> None:
+        if self.slow_call_seconds is not None and \
+                duration > self.slow_call_seconds:
+            success = False
+
+        with self._lock:
+            transition = self._record(success)
+        self._notify(transition)
+
+    def _record(self, success: bool) -> Optional[Tuple[str, str]]:
+        if self.state == HALF_OPEN:
+            if not success:
+                return self._transition(OPEN)
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                return self._transition(CLOSED)
+            return None
+
+        if self.state == OPEN:
+            return None
+
+        self._outcomes.append(success)
+        if len(self._outcomes) < self.min_calls:
+            return None
+        failures = self._outcomes.count(False)
+        if failures / len(self._outcomes) >= self.failure_rate_threshold:
+            return self._transition(OPEN)
+        return None
+
+    def _transition(self, state: str) -> Tuple[str, str]:
+        previous, self.state = self.state, state
+        self._trials = 0
+        self._trial_successes = 0
+        if state == OPEN:
+            self._opened_at = self._clock()
+        if state == CLOSED:
+            self._outcomes.clear()
+        return previous, state
+
+    def _notify(self, transition: Optional[Tuple[str, str]]) -> None:
+        # called once the lock is released, listeners may use the breaker
+        if transition and self._on_transition:
+            self._on_transition(self.key, *transition)
+
+
+class DeferredCall:
+    __slots__ = ("key", "func", "args", "kwargs")
+
+    def __init__(
+        self, key: BreakerKey, func: Callable, args: tuple, kwargs: dict
+    ) -> None:
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def retry(self, registry: "CircuitBreakerRegistry") -> Any:
+        return registry.call(
+            self.key[0], self.key[1], self.func, *self.args, **self.kwargs)
+
+
+class DeferralQueue:
+    """
+    Keeps the calls rejected by an open circuit to be retried later. Any
+    object with a key and a retry(registry) method can be queued, see
+    DeferredCall and response.DeferredMessage. When max_size calls are
+    waiting new ones are refused and counted in `rejected`, the registry
+    then raises CircuitOpenError for them.
+    """
+    max_size: int
+    rejected: int
+
+    def __init__(self, max_size: int = 10_000) -> None:
+        self.max_size = max_size
+        self.rejected = 0
+        self._calls: Deque[Any] = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __call__(self, call: Any) -> bool:
+        with self._lock:
+            if len(self._calls) >= self.max_size:
+                self.rejected += 1
+                return False
+            self._calls.append(call)
+            return True
+
+    def drain(self, registry: "CircuitBreakerRegistry") -> List[Any]:
+        # retries the calls whose circuit lets them through, in order
+        with self._lock:
+            calls, self._calls = list(self._calls), deque()
+
+        results = []
+        for call in calls:
+            try:
+                results.append(call.retry(registry))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class CircuitBreakerRegistry:
+    """
+    One CircuitBreaker per (account_pid, endpoint). While a circuit is open
+    calls raise CircuitOpenError, or go to `deferral` when one is given and
+    the call allows it. A deferral returning False refuses the call.
+    """
+    breaker_options: Dict[str, Any]
+    listeners: List[TransitionListener]
+    deferral: Optional[Callable[[Any], None]]
+
+    def __init__(
+        self,
+        deferral: Optional[Callable[[Any], None]] = None,
+        **breaker_options: Any,
+    ) -> None:
+        self.breaker_options = breaker_options
+        self.deferral = deferral
+        self.listeners = []
+        self.transitions: Deque[Tuple[float, BreakerKey, str, str]] = deque(
+            maxlen=1000)
+        self._breakers: Dict[BreakerKey, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: TransitionListener) -> None:
+        self.listeners.append(listener)
+
+    def get(self, account_pid: str, endpoint: str) -> CircuitBreaker:
+        key = (account_pid, endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = self._breakers[key] = CircuitBreaker(
+                        key, on_transition=self._notify,
+                        **self.breaker_options)
+        return breaker
+
+    def states(self) -> Dict[BreakerKey, str]:
+        return {key: breaker.state for key, breaker in self._breakers.items()}
+
+    def call(
+        self,
+        account_pid: str,
+        endpoint: str,
+        func: Callable,
+        *args: Any,
+        is_success: Optional[Callable[[Any], bool]] = None,
+        deferred: Optional[Any] = None,
+        defer: bool = True,
+        is_neutral_error: Optional[Callable[[Exception], bool]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        # `deferred` is queued instead of the raw call when the circuit is
+        # open, so callers can retry at a higher level than func; defer=False
+        # fails fast even with a deferral. Errors matching is_neutral_error
+        # (e.g. a timeout the caller chose) are not recorded.
+        breaker = self.get(account_pid, endpoint)
+        if not breaker.allow():
+            if self.deferral is None or not defer:
+                raise CircuitOpenError(breaker.key)
+            if deferred is None:
+                if is_success is not None:
+                    kwargs["is_success"] = is_success
+                deferred = DeferredCall(breaker.key, func, args, kwargs)
+            if self.deferral(deferred) is False:
+                raise CircuitOpenError(breaker.key)
+            return None
+
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_neutral_error is not None and is_neutral_error(e):
+                breaker.release()
+            else:
+                breaker.record(False, time.monotonic() - started)
+            raise
+
+        success = is_success(result) if is_success else True
+        breaker.record(success, time.monotonic() - started)
+        return result
+
+    def _notify(self, key: BreakerKey, previous: str, state: str) -> None:
+        self.transitions.append((time.time(), key, previous, state))
+        for listener in self.listeners:
+            listener(key, previous, state)
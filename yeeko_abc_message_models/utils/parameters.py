@@ -1,8 +1,13 @@
 import re
 
+PARAMETER_PATTERN = re.compile(r"\{\{([\w.]+)\}\}")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 
 def replace_parameter(extra_values_data: dict, text: str, default: str = ""):
-    pattern = r"\{\{([\w.]+)\}\}"
+    if "{{" not in text:
+        # nothing to replace, only normalize the whitespace
+        return WHITESPACE_PATTERN.sub(" ", text.strip())
 
     def get_nested_value(data, keys):
         for key in keys:
@@ -50,6 +55,6 @@ def replace_parameter(extra_values_data: dict, text: str, default: str = ""):
         else:
             return str(value)
 
-    result = re.sub(pattern, replace_match, text)
-    result_text = re.sub(r'\s+', ' ', result.strip())
+    result = PARAMETER_PATTERN.sub(replace_match, text)
+    result_text = WHITESPACE_PATTERN.sub(" ", result.strip())
     return result_text
@@ -0,0 +1,25 @@
+from typing import Dict, Iterable, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    # linear interpolation between closest ranks, values must be sorted
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    fraction = position - lower
+    return values[lower] + (values[upper] - values[lower]) * fraction
+
+
+def summarize(
+    values: Iterable[float], percentiles=(50, 90, 99)
+) -> Dict[str, float]:
+    ordered = sorted(values)
+    summary = {
+        "count": len(ordered),
+        "max": ordered[-1] if ordered else 0.0,
+    }
+    for q in percentiles:
+        summary[f"p{q}"] = percentile(ordered, q)
+    return summary
@@ -0,0 +1,21 @@
+import importlib
+
+# submodules are imported on first access so parsing-only processes don't
+# pay for the http client
+_LAZY_ATTRIBUTES = {
+    "WhatsAppRequest": "request",
+    "set_status_read": "request",
+    "get_file_content": "request",
+    "WhatsAppResponse": "response",
+    "get_api_url": "graph_api",
+    "get_api_version": "graph_api",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+    return getattr(module, name)
@@ -0,0 +1,58 @@
+import os
+from typing import Any, Optional
+
+
+def get_api_version() -> str:
+    return os.getenv('FACEBOOK_API_VERSION', 'v13.0')
+
+
+def get_api_url() -> str:
+    # read on every call so workers pick up the environment at runtime,
+    # FACEBOOK_API_URL overrides the whole url (e.g. a local fake server)
+    return os.getenv('FACEBOOK_API_URL') or \
+        f'https://graph.facebook.com/{get_api_version()}'
+
+
+def is_healthy_response(response: Any) -> bool:
+    # rate limits and server errors count against the circuit breaker,
+    # client errors are the caller's fault
+    return response.status_code < 500 and response.status_code != 429
+
+
+def graph_request(
+    method: str,
+    url: str,
+    account_pid: str,
+    endpoint: str,
+    circuit_breakers: Optional[Any] = None,
+    deferred: Optional[Any] = None,
+    budget_timeout: bool = False,
+    **kwargs: Any,
+) -> Any:
+    """
+    Performs the http call through the CircuitBreakerRegistry when given.
+    Only calls given a `deferred` (message sends) can be deferred by an open
+    circuit, then None is returned; the rest raise CircuitOpenError. Breakers
+    are per account, so account_pid is required with circuit_breakers.
+    budget_timeout tells that `timeout` was cut to the caller's deadline, a
+    timeout then says nothing about the endpoint and is not recorded.
+    """
+    import requests
+
+    func = getattr(requests, method)
+    if circuit_breakers is None:
+        return func(url, **kwargs)
+    if not account_pid:
+        raise ValueError(
+            f"account_pid is required to call {endpoint} with circuit_breakers")
+    return circuit_breakers.call(
+        account_pid, endpoint, func, url,
+        is_success=is_healthy_response, deferred=deferred,
+        defer=deferred is not None,
+        is_neutral_error=_is_timeout if budget_timeout else None, **kwargs)
+
+
+def _is_timeout(e: Exception) -> bool:
+    import requests
+
+    return isinstance(e, requests.Timeout)
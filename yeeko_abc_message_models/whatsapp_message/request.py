@@ -1,27 +1,35 @@
-from typing import Optional
-import os
-
-import requests
+from typing import Any, Optional
 
 
 from yeeko_abc_message_models.request import InputAccount, RequestAbc
+from yeeko_abc_message_models.request.delivery import (
+    StatusCompactionWindow, compact_sender_statuses)
 from yeeko_abc_message_models.request.message_model import (
     InteractiveMessage, EventMessage, MediaMessage, TextMessage
 )
+from yeeko_abc_message_models.whatsapp_message.graph_api import (
+    get_api_url, get_api_version, graph_request)
+
 
-FACEBOOK_API_VERSION = os.getenv('FACEBOOK_API_VERSION', 'v13.0')
-FACEBOOK_API_URL = f'https://graph.facebook.com/{FACEBOOK_API_VERSION}'
+def __getattr__(name: str):
+    # kept for backwards compatibility, resolved from the environment on access
+    if name == "FACEBOOK_API_VERSION":
+        return get_api_version()
+    if name == "FACEBOOK_API_URL":
+        return get_api_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def set_status_read(
     message_id: str,
     phone_number_id: str,
     token: Optional[str],
+    circuit_breakers: Optional[Any] = None,
 ) -> None:
     if not token:
         return
 
-    url = f"{FACEBOOK_API_URL}/{phone_number_id}/messages"
+    url = f"{get_api_url()}/{phone_number_id}/messages"
 
     headers = {
         "Authorization": f"Bearer {token}",
@@ -33,25 +41,37 @@ def set_status_read(
         "messaging_product": "whatsapp",
         "status": "read",
     }
-    _ = requests.post(url, headers=headers, json=message_data)
+    _ = graph_request(
+        "post", url, phone_number_id, "read_status", circuit_breakers,
+        headers=headers, json=message_data)
 
 
-def get_file_content(media_id: str, token: str) -> bytes | None:
-    url_media = f"{FACEBOOK_API_URL}/{media_id}"
+def get_file_content(
+    media_id: str, token: str, circuit_breakers: Optional[Any] = None,
+    account_pid: Optional[str] = None
+) -> bytes | None:
+    # account_pid (the phone_number_id) keys the breakers, it is required
+    # when circuit_breakers is given; an open circuit raises CircuitOpenError
+    # so it is not mistaken for missing media
+    url_media = f"{get_api_url()}/{media_id}"
 
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
     }
-    response = requests.get(url_media, headers=headers)
+    response = graph_request(
+        "get", url_media, account_pid, "media_metadata", circuit_breakers,
+        headers=headers)
 
-    if response.status_code == 200:
+    if response is not None and response.status_code == 200:
         media_info = response.json()
         media_url = media_info.get("url")
 
-        media_response = requests.get(media_url, headers=headers)
+        media_response = graph_request(
+            "get", media_url, account_pid, "media_download",
+            circuit_breakers, headers=headers)
 
-        if media_response.status_code == 200:
+        if media_response is not None and media_response.status_code == 200:
             return media_response.content
 
 
@@ -62,9 +82,22 @@ class WhatsAppRequest(RequestAbc):
 
     messages_ids: list[str]
 
-    def __init__(self, raw_data: dict, debug=False) -> None:
-        super().__init__(raw_data, debug=debug)
+    compact_statuses: bool
+    compaction_window: Optional[StatusCompactionWindow]
+    compacted_statuses: int
+
+    def __init__(
+        self, raw_data: dict, debug=False, outbound_index: Any = None,
+        compact_statuses: bool = False,
+        compaction_window: Optional[StatusCompactionWindow] = None,
+    ) -> None:
+        # sort_data runs inside RequestAbc.__init__ and needs the contacts
         self._contacts_data = {}
+        self.compact_statuses = compact_statuses or bool(compaction_window)
+        self.compaction_window = compaction_window
+        self.compacted_statuses = 0
+        super().__init__(
+            raw_data, debug=debug, outbound_index=outbound_index)
 
     def sort_data(self):
         entry = self.raw_data.get("entry", [])
@@ -77,6 +110,16 @@ class WhatsAppRequest(RequestAbc):
                     data_error = {"change_data": change}
                     self.add_error(data_error, e=e)
 
+        if self.compact_statuses:
+            self._compact_statuses()
+
+    def _compact_statuses(self) -> None:
+        # only the most advanced status per (recipient, message_id) is kept
+        for input_account in self.input_accounts:
+            for input_sender in input_account.members:
+                self.compacted_statuses += compact_sender_statuses(
+                    input_sender, self.compaction_window)
+
     def _process_change(self, change: dict) -> None:
         input_account = self._get_input_account(change)
         if not input_account:
@@ -138,6 +181,7 @@ class WhatsAppRequest(RequestAbc):
                 continue
 
             message_class = self.data_to_class(message)
+            self.attach_outbound(message_class, input_account.pid, sender_id)
 
             input_sender.messages.append(message_class)
 
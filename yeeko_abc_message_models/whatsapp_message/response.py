@@ -1,16 +1,31 @@
-import os
-import requests
-from typing import Any, Dict, Optional
+from pydantic import Field
+from typing import Any, Dict, Optional, Tuple
 
 from yeeko_abc_message_models.response import ResponseAbc
 from yeeko_abc_message_models.response.models import (
     Message, Section, SectionsMessage, ReplyMessage)
+from yeeko_abc_message_models.whatsapp_message.graph_api import (
+    get_api_url, get_api_version, graph_request)
 
-FACEBOOK_API_VERSION = os.getenv('FACEBOOK_API_VERSION', 'v13.0')
+MAX_TEXT_BODY_LENGTH = 4096
+# library bookkeeping kept in message_list but never posted, besides the
+# keys starting with "_"
+LOCAL_KEYS = {"uuid_list"}
+
+
+def __getattr__(name: str):
+    # kept for backwards compatibility, resolved from the environment on access
+    if name == "FACEBOOK_API_VERSION":
+        return get_api_version()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class WhatsAppResponse(ResponseAbc):
-    base_url: str = f'https://graph.facebook.com/{FACEBOOK_API_VERSION}'
+    base_url: str = Field(default_factory=get_api_url)
+    # a CircuitBreakerRegistry shared by the responses of every account
+    circuit_breakers: Optional[Any] = None
+    # http timeout in seconds, shortened to the remaining deadline budget
+    request_timeout: Optional[float] = None
 
     def _base_data(
             self, type_str: str, body: Optional[dict] = None,
@@ -59,6 +74,35 @@ class WhatsAppResponse(ResponseAbc):
 
         return self._base_data(media_type, body, fragment_id)
 
+    def _merge_text_data(
+        self, previous: dict, message: dict, separator: str
+    ) -> Optional[dict]:
+        if previous.get("type") != "text" or message.get("type") != "text":
+            return None
+        if previous.get("to") != message.get("to"):
+            return None
+        if previous.get("_deadline") != message.get("_deadline"):
+            # the merged message could only keep one of them
+            return None
+
+        previous_body = previous.get("text", {})
+        message_body = message.get("text", {})
+        if set(previous_body) != {"body"} or set(message_body) != {"body"}:
+            # preview_url or any other option would change the meaning
+            return None
+
+        body = previous_body["body"] + separator + message_body["body"]
+        if len(body) > MAX_TEXT_BODY_LENGTH:
+            return None
+
+        fragment_ids = previous.get(
+            "_fragment_ids", [previous.get("_fragment_id")])
+        merged = dict(previous, text={"body": body})
+        merged["_fragment_ids"] = fragment_ids + [message.get("_fragment_id")]
+        merged["_standard_message"] = {
+            **previous.get("_standard_message", {}), "body": body}
+        return merged
+
     def _message_to_data(
             self, message: Message, header_supp_media=False
     ) -> dict:
@@ -143,9 +187,14 @@ class WhatsAppResponse(ResponseAbc):
                 "sections": sections,
             }
         })
-        return self._base_data(
+        whatsapp_data_message = self._base_data(
             "interactive", interactive, fragment_id=message.fragment_id)
 
+        whatsapp_data_message["uuid_list"] = [
+            row["id"] for section in sections for row in section["rows"]]
+
+        return whatsapp_data_message
+
     def many_buttons_to_data(self, message: ReplyMessage) -> dict:
 
         interactive = self._message_to_data(message)
@@ -183,18 +232,46 @@ class WhatsAppResponse(ResponseAbc):
             return None
         return messages[0].get("id")
 
+    def _get_timeout(self) -> Tuple[Optional[float], bool]:
+        # the timeout and whether it was cut to the remaining deadline
+        remaining = self.remaining_time()
+        if remaining is None:
+            return self.request_timeout, False
+        remaining = max(remaining, 0.001)
+        if self.request_timeout is None or remaining < self.request_timeout:
+            return remaining, True
+        return self.request_timeout, False
+
     def send_message(
         self, message_data: dict
-    ):
-
+    ) -> Optional[dict]:
         url = f"{self.base_url}/{self.account_pid}/messages"
         headers = {
             "Authorization": f"Bearer {self.account_token}",
             "Content-Type": "application/json",
         }
 
-        response = requests.post(url, headers=headers, json=message_data)
+        # private keys like _deadline or _fragment_ids stay in the library
+        payload = {
+            key: value for key, value in message_data.items()
+            if not key.startswith("_") and key not in LOCAL_KEYS
+        }
+        deferred = self._defer(message_data)
+        timeout, budget_timeout = self._get_timeout()
+        response = graph_request(
+            "post", url, self.account_pid, "messages", self.circuit_breakers,
+            deferred=deferred, budget_timeout=budget_timeout,
+            headers=headers, json=payload, timeout=timeout)
+        if response is None:
+            # deferred by an open circuit, retried by DeferralQueue.drain
+            deferred.mark()
+            return None
         try:
             response_body = response.json()
         except ValueError:
             response_body = {"body": response.text}
+
+        if 200 <= response.status_code < 300:
+            # a rejected message was never delivered, replies can't point to it
+            self._register_outbound(message_data, response_body)
+        return response_body